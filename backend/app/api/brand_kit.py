@@ -2,7 +2,7 @@
 API routes for brand kit management
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request, Response
 from typing import List, Optional
 import json
 import uuid
@@ -75,10 +75,17 @@ async def get_brand_kit(brand_id: str):
 
 
 @router.get("/brand-kits", response_model=List[BrandKit])
-async def list_brand_kits():
+async def list_brand_kits(request: Request, response: Response):
     """
     List all available brand kits
     """
+    # Listing only changes when the brand-kit directory does
+    etag = f'W/"{brand_service.listing_version():x}"'
+    headers = {"ETag": etag, "Cache-Control": "max-age=30"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
     return await brand_service.list_brand_kits()
 
 
@@ -56,10 +56,13 @@ async def critique_ad(
             brand_kit = await brand_service.get_brand_kit(brand_id)
         
         # Perform critique
+        # Critique the uploaded bytes directly instead of re-reading the saved file
         critique = await critique_engine.critique_ad(
             image_path=file_path,
             brand_kit=brand_kit,
-            ad_description=ad_description
+            ad_description=ad_description,
+            image_bytes=content,
+            mime_type=file.content_type
         )
         
         return critique
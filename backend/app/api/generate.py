@@ -3,7 +3,7 @@ API routes for ad generation (secondary feature)
 """
 
 from fastapi import APIRouter, HTTPException, Form
-from typing import Optional
+from typing import Literal, Optional
 
 from app.models.schemas import GenerateAdRequest
 from app.services.generation_service import GenerationService
@@ -19,7 +19,8 @@ async def generate_ad(
     product_description: str = Form(...),
     tagline: Optional[str] = Form(None),
     style: str = Form("modern"),
-    media_type: str = Form("image")
+    media_type: str = Form("image"),
+    image_format: Literal["png", "jpeg"] = Form("png")
 ):
     """
     Generate a basic ad using AI (secondary feature)
@@ -38,7 +39,8 @@ async def generate_ad(
         product_description=product_description,
         tagline=tagline,
         style=style,
-        media_type=media_type
+        media_type=media_type,
+        image_format=image_format
     )
     
     try:
@@ -56,7 +58,8 @@ async def generate_variants(
     tagline: Optional[str] = Form(None),
     style: str = Form("modern"),
     media_type: str = Form("image"),
-    num_variants: int = Form(3)
+    num_variants: int = Form(3),
+    image_format: Literal["png", "jpeg"] = Form("png")
 ):
     """
     Generate multiple ad variants (A, B, C) for comparison
@@ -75,7 +78,8 @@ async def generate_variants(
         product_description=product_description,
         tagline=tagline,
         style=style,
-        media_type=media_type
+        media_type=media_type,
+        image_format=image_format
     )
     
     try:
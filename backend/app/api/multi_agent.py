@@ -2,13 +2,18 @@
 Multi-Agent Workflow API - Auto-refining ad generation
 """
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, Set
+import asyncio
 import logging
+import orjson
 import os
 import uuid
 
 from app.core.multi_agent_orchestrator import MultiAgentOrchestrator
+from app.core.refinement_agent import ServiceTier
 from app.services.brand_service import BrandService
 from app.core.descriptor_agent import DescriptorAgent
 from app.core.critique_engine import CritiqueEngine
@@ -22,6 +27,14 @@ brand_service = BrandService()
 descriptor_agent = DescriptorAgent()
 critique_engine = CritiqueEngine()
 
+# Progress events of background workflow jobs, drained by /stream/{job_id}.
+# Held in process memory, so streaming jobs need a single worker (see _jobs_supported).
+_JOBS: Dict[str, asyncio.Queue] = {}
+# Seconds a finished job waits for a subscriber before it is dropped
+_JOB_TTL = 600
+# Strong references so running job tasks are not garbage-collected
+_JOB_TASKS: Set[asyncio.Task] = set()
+
 
 class MultiAgentRequest(BaseModel):
     """Request for multi-agent workflow"""
@@ -33,6 +46,9 @@ class MultiAgentRequest(BaseModel):
     include_logo: bool = Field(True, description="Include brand logo in ad")
     max_iterations: int = Field(3, ge=1, le=10, description="Maximum refinement iterations")
     score_threshold: float = Field(0.75, ge=0.0, le=1.0, description="Target quality score")
+    service_tier: ServiceTier = Field(
+        "standard", description="Gemini service tier for refinement: 'flex' for non-urgent/CI runs, 'priority' for the user path"
+    )
 
 
 class MultiAgentResponse(BaseModel):
@@ -62,51 +78,7 @@ async def generate_and_refine_ad(request: MultiAgentRequest):
     Returns detailed iteration history and best result.
     """
     try:
-        logger.info(f"Multi-agent request: prompt='{request.prompt[:50]}...', iterations={request.max_iterations}")
-        
-        # Load brand kit if specified
-        brand_kit_data = None
-        if request.brand_kit_id:
-            brand_kit_data = await brand_service.get_brand_kit(request.brand_kit_id)
-            if not brand_kit_data:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Brand kit '{request.brand_kit_id}' not found"
-                )
-        
-        # Initialize orchestrator
-        orchestrator = MultiAgentOrchestrator(
-            gemini_api_key=settings.gemini_api_key,
-            vertex_project_id=settings.google_cloud_project,
-            vertex_location=settings.vertex_ai_location,
-            max_iterations=request.max_iterations,
-            score_threshold=request.score_threshold
-        )
-        
-        # Run workflow
-        result = await orchestrator.generate_and_refine(
-            prompt=request.prompt,
-            brand_kit_id=request.brand_kit_id,
-            aspect_ratio=request.aspect_ratio,
-            media_type=request.media_type,
-            duration=request.duration,
-            include_logo=request.include_logo,
-            brand_kit_data=brand_kit_data
-        )
-        
-        # Build response message
-        if result["threshold_met"]:
-            message = f"✅ Success! Achieved {result['final_score']:.2f} score in {result['iterations_count']} iteration(s)"
-        elif result["best_ad"]:
-            message = f"⚠️ Best score: {result['final_score']:.2f} after {result['iterations_count']} iterations (target: {request.score_threshold})"
-        else:
-            message = f"❌ Failed to generate acceptable ad after {result['iterations_count']} iterations"
-        
-        result["message"] = message
-        
-        logger.info(f"Multi-agent workflow complete: {message}")
-        
-        return MultiAgentResponse(**result)
+        return await _run_workflow(request)
         
     except HTTPException:
         raise
@@ -118,6 +90,138 @@ async def generate_and_refine_ad(request: MultiAgentRequest):
         )
 
 
+@router.post("/jobs")
+async def start_workflow_job(request: MultiAgentRequest):
+    """
+    Start the multi-agent workflow in the background.
+    
+    Returns a job_id; follow its progress with Server-Sent Events at stream_url.
+    The final event has status "done" (with the full result) or "error".
+    
+    Jobs live in the worker's memory, so this needs a single worker process
+    (APP_WORKERS=1, or debug/reload mode); otherwise it answers 501.
+    """
+    if not _jobs_supported():
+        raise HTTPException(
+            status_code=501,
+            detail="Streaming jobs need a single worker (APP_WORKERS=1); use /generate-and-refine"
+        )
+    
+    job_id = str(uuid.uuid4())
+    queue: asyncio.Queue = asyncio.Queue()
+    _JOBS[job_id] = queue
+    
+    task = asyncio.create_task(_run_job(job_id, queue, request))
+    _JOB_TASKS.add(task)
+    task.add_done_callback(_JOB_TASKS.discard)
+    
+    return {"job_id": job_id, "stream_url": f"/api/multi-agent/stream/{job_id}"}
+
+
+@router.get("/stream/{job_id}")
+async def stream_workflow_job(job_id: str):
+    """Server-Sent Events stream of a workflow job's progress"""
+    queue = _JOBS.get(job_id)
+    if queue is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    
+    async def events():
+        try:
+            while True:
+                event = await queue.get()
+                yield b"data: " + orjson.dumps(jsonable_encoder(event)) + b"\n\n"
+                if event["status"] in ("done", "error"):
+                    break
+        finally:
+            _JOBS.pop(job_id, None)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _jobs_supported() -> bool:
+    """
+    Job state lives in this process, so with several uvicorn workers the stream
+    request could reach a worker that never saw the job (reload mode runs one)
+    """
+    return settings.app_workers <= 1 or settings.debug
+
+
+async def _run_job(job_id: str, queue: asyncio.Queue, request: MultiAgentRequest):
+    """
+    Run one workflow, pushing progress and the final result onto its queue.
+    A job nobody streams is dropped _JOB_TTL seconds after it ends.
+    """
+    try:
+        result = await _run_workflow(request, progress_callback=queue.put_nowait)
+        queue.put_nowait({"status": "done", "result": result})
+    except HTTPException as e:
+        queue.put_nowait({"status": "error", "detail": e.detail})
+    except Exception as e:
+        logger.error(f"Multi-agent job error: {str(e)}", exc_info=True)
+        queue.put_nowait({"status": "error", "detail": f"Multi-agent workflow failed: {str(e)}"})
+    finally:
+        # A stream already reading holds its own reference to the queue
+        asyncio.get_running_loop().call_later(_JOB_TTL, _JOBS.pop, job_id, None)
+
+
+async def _run_workflow(
+    request: MultiAgentRequest,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> MultiAgentResponse:
+    """Run the workflow for a request (shared by the blocking and streaming endpoints)"""
+    logger.info(f"Multi-agent request: prompt='{request.prompt[:50]}...', iterations={request.max_iterations}")
+    
+    # Load brand kit if specified
+    brand_kit_data = None
+    if request.brand_kit_id:
+        brand_kit_data = await brand_service.get_brand_kit(request.brand_kit_id)
+        if not brand_kit_data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Brand kit '{request.brand_kit_id}' not found"
+            )
+    
+    # Initialize orchestrator
+    orchestrator = MultiAgentOrchestrator(
+        gemini_api_key=settings.gemini_api_key,
+        vertex_project_id=settings.google_cloud_project,
+        vertex_location=settings.vertex_ai_location,
+        max_iterations=request.max_iterations,
+        score_threshold=request.score_threshold
+    )
+    
+    # Run workflow
+    result = await orchestrator.generate_and_refine(
+        prompt=request.prompt,
+        brand_kit_id=request.brand_kit_id,
+        aspect_ratio=request.aspect_ratio,
+        media_type=request.media_type,
+        duration=request.duration,
+        include_logo=request.include_logo,
+        brand_kit_data=brand_kit_data,
+        service_tier=request.service_tier,
+        progress_callback=progress_callback
+    )
+    
+    # Build response message
+    if result["threshold_met"]:
+        message = f"✅ Success! Achieved {result['final_score']:.2f} score in {result['iterations_count']} iteration(s)"
+    elif result["best_ad"]:
+        message = f"⚠️ Best score: {result['final_score']:.2f} after {result['iterations_count']} iterations (target: {request.score_threshold})"
+    else:
+        message = f"❌ Failed to generate acceptable ad after {result['iterations_count']} iterations"
+    
+    result["message"] = message
+    
+    logger.info(f"Multi-agent workflow complete: {message}")
+    
+    return MultiAgentResponse(**result)
+
+
 @router.get("/workflow-status")
 async def get_workflow_info():
     """
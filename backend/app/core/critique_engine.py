@@ -8,10 +8,13 @@ to evaluate AI-generated ads across multiple dimensions.
 import google.generativeai as genai
 from google.cloud import aiplatform
 from PIL import Image
-import json
+import asyncio
+import hashlib
 import os
-from typing import Dict, Tuple, Optional
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional
 import cv2
+import msgspec
 import numpy as np
 
 from config import settings
@@ -21,6 +24,28 @@ from app.models.schemas import (
 )
 from app.utils.image_analysis import ImageAnalyzer
 from app.utils.color_analysis import ColorMatcher
+from app.utils.gemini_cache import GeminiContextCache, GeminiFileRegistry
+
+# CV analysis results per image version (path, mtime, size) and brand kit.
+# Module-level so every CritiqueEngine instance (one per router / workflow) shares it.
+_ANALYSIS_CACHE: "OrderedDict[tuple, Tuple[VisualAnalysis, ColorAnalysis]]" = OrderedDict()
+_ANALYSIS_CACHE_SIZE = 256
+
+# Ads per multi-image Gemini request; each critique is ~2k output tokens,
+# so this keeps a batch response well inside the output limit
+_CRITIQUE_BATCH_SIZE = 8
+
+# Brand context + rubric prefix (~2k tokens) served from an explicit context cache;
+# 2.5 Flash accepts cached prefixes from 1024 tokens. Shared by every instance so a
+# brand's CachedContent is created once per TTL, not once per workflow.
+_CONTEXT_CACHE = GeminiContextCache(
+    model_name='gemini-2.5-flash',
+    cached_model_name='models/gemini-2.5-flash',
+    min_tokens=1024
+)
+
+# Brand logos uploaded to the Files API once per process (per file version), not per workflow
+_BRAND_FILES = GeminiFileRegistry()
 
 
 class CritiqueEngine:
@@ -33,7 +58,10 @@ class CritiqueEngine:
         """Initialize the critique engine with Gemini API"""
         if settings.gemini_api_key:
             genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            self.model = genai.GenerativeModel('gemini-2.5-flash')
+            self._context_cache = _CONTEXT_CACHE
+            # Brand logos are uploaded once and referenced by handle in every critique
+            self._brand_files = _BRAND_FILES
         else:
             # Use Vertex AI if no API key
             aiplatform.init(
@@ -41,40 +69,50 @@ class CritiqueEngine:
                 location=settings.vertex_ai_location
             )
             self.model = None
+            self._context_cache = None
+            self._brand_files = None
         
         self.image_analyzer = ImageAnalyzer()
         self.color_matcher = ColorMatcher()
     
     async def critique_ad(
         self,
-        image_path: str,
+        image_path: Optional[str] = None,
         brand_kit: Optional[BrandKit] = None,
-        ad_description: Optional[str] = None
+        ad_description: Optional[str] = None,
+        image_bytes: Optional[bytes] = None,
+        mime_type: str = "image/jpeg"
     ) -> AdCritique:
         """
         Main critique function that evaluates an ad comprehensively.
         
         Args:
-            image_path: Path to the ad image
+            image_path: Path to the ad image (used when image_bytes is not given)
             brand_kit: Brand guidelines for comparison
             ad_description: Optional description of the ad content
+            image_bytes: Encoded ad image; decoded in memory and sent to Gemini as-is
+            mime_type: MIME type of image_bytes
             
         Returns:
             AdCritique: Comprehensive critique with scores and feedback
         """
+        if image_bytes is None and image_path is None:
+            raise ValueError("critique_ad needs image_bytes or image_path")
         
         # Analyze image using computer vision
-        visual_analysis = await self._analyze_visual_quality(image_path)
-        color_analysis = await self._analyze_colors(image_path, brand_kit)
+        visual_analysis, color_analysis, img, pil_image = await self._run_analyzers(
+            image_path, brand_kit, image_bytes
+        )
         
         # Get AI-powered critique using Gemini
         ai_critique = await self._get_gemini_critique(
-            image_path, brand_kit, ad_description
+            image_path, brand_kit, ad_description, pil_image, img,
+            image_blob={"mime_type": mime_type, "data": image_bytes} if image_bytes else None
         )
         
         # Combine analyses into final critique
         critique = await self._compile_critique(
-            image_path,
+            image_path or "",
             brand_kit,
             visual_analysis,
             color_analysis,
@@ -83,38 +121,191 @@ class CritiqueEngine:
         
         return critique
     
-    async def _analyze_visual_quality(self, image_path: str) -> VisualAnalysis:
+    async def critique_ads_batch(
+        self,
+        image_paths: List[str],
+        brand_kit: Optional[BrandKit] = None,
+        ad_description: Optional[str] = None
+    ) -> List[AdCritique]:
+        """
+        Critique several ads of one brand, sending up to _CRITIQUE_BATCH_SIZE
+        images per Gemini request instead of one request per image.
+        
+        Args:
+            image_paths: Paths to the ad images
+            brand_kit: Brand guidelines for comparison
+            ad_description: Optional description shared by the ads
+            
+        Returns:
+            List[AdCritique]: One critique per image, in input order
+        """
+        
+        analyses = await asyncio.gather(
+            *(self._run_analyzers(path, brand_kit) for path in image_paths)
+        )
+        
+        ai_critiques: List[Dict] = []
+        for start in range(0, len(image_paths), _CRITIQUE_BATCH_SIZE):
+            chunk = slice(start, start + _CRITIQUE_BATCH_SIZE)
+            ai_critiques.extend(await self._get_gemini_critiques_batch(
+                image_paths[chunk], analyses[chunk], brand_kit, ad_description
+            ))
+        
+        return list(await asyncio.gather(*(
+            self._compile_critique(path, brand_kit, visual, color, ai_critique)
+            for path, (visual, color, _, _), ai_critique in zip(image_paths, analyses, ai_critiques)
+        )))
+    
+    async def _get_gemini_critiques_batch(
+        self,
+        image_paths: List[str],
+        analyses: List[tuple],
+        brand_kit: Optional[BrandKit],
+        ad_description: Optional[str]
+    ) -> List[Dict]:
+        """One Gemini request for several images; falls back per image on a missing entry"""
+        
+        labels = [f"ad_{i}" for i in range(1, len(image_paths) + 1)]
+        prefix = self._build_critique_prefix(brand_kit)
+        
+        contents = [self._build_critique_tail(brand_kit, ad_description)]
+        contents.extend(await self._brand_reference_parts(brand_kit))
+        for label, (_, _, _, pil_image) in zip(labels, analyses):
+            contents.extend([f"{label}:", pil_image])
+        contents.append(
+            f"Critique each of the {len(labels)} advertisements above independently. "
+            f"Return ONLY a JSON object whose keys are {', '.join(labels)} and whose values "
+            "follow the critique structure described in your instructions."
+        )
+        
+        batch: Dict = {}
+        try:
+            model = await self._critique_model_for(brand_kit, prefix)
+            response = await model.generate_content_async(contents)
+            batch = self._parse_gemini_response(response.text)
+        except Exception as e:
+            print(f"Error getting batched Gemini critique: {e}")
+        
+        return [
+            batch[label] if isinstance(batch.get(label), dict)
+            else self._get_fallback_critique(path, img)
+            for label, path, (_, _, img, _) in zip(labels, image_paths, analyses)
+        ]
+    
+    async def _run_analyzers(
+        self,
+        image_path: Optional[str],
+        brand_kit: Optional[BrandKit],
+        image_bytes: Optional[bytes] = None
+    ) -> Tuple[VisualAnalysis, ColorAnalysis, np.ndarray, Image.Image]:
+        """
+        Run the CV analyzers, reusing earlier results for an unchanged image.
+        The image is decoded once (off the event loop) and the pixels are shared by
+        every analyzer; a cache hit still decodes, so Gemini and the CV fallback
+        critique get the same inputs as on a miss.
+        
+        Returns:
+            (visual_analysis, color_analysis, BGR pixels, PIL image)
+        """
+        img, pil_image = await asyncio.to_thread(self._load_pixels, image_path, image_bytes)
+        
+        key = self._analysis_key(image_path, brand_kit, image_bytes)
+        cached = _ANALYSIS_CACHE.get(key) if key else None
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+            return (*cached, img, pil_image)
+        
+        # Independent OpenCV work (releases the GIL) - run both off the event loop in parallel
+        visual_analysis, color_analysis = await asyncio.gather(
+            self._analyze_visual_quality(img),
+            self._analyze_colors(img, brand_kit)
+        )
+        
+        if key:
+            _ANALYSIS_CACHE[key] = (visual_analysis, color_analysis)
+            if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+                _ANALYSIS_CACHE.popitem(last=False)
+        
+        return visual_analysis, color_analysis, img, pil_image
+    
+    def _load_pixels(
+        self,
+        image_path: Optional[str],
+        image_bytes: Optional[bytes]
+    ) -> Tuple[np.ndarray, Image.Image]:
+        """Blocking decode to BGR pixels plus the matching RGB PIL image"""
+        if image_bytes is not None:
+            img = self._decode_image_bytes(image_bytes)
+        else:
+            img = self.image_analyzer.load_image(image_path)
+        return img, Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    
+    @staticmethod
+    def _decode_image_bytes(image_bytes: bytes) -> np.ndarray:
+        """Decode an encoded image to BGR without touching the filesystem"""
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("Could not decode image bytes")
+        return img
+    
+    @staticmethod
+    def _analysis_key(
+        image_path: Optional[str],
+        brand_kit: Optional[BrandKit],
+        image_bytes: Optional[bytes] = None
+    ) -> Optional[tuple]:
+        """Cache key that changes whenever the image or the brand kit changes"""
+        brand_json = brand_kit.model_dump_json() if brand_kit else None
+        if image_bytes is not None:
+            return (hashlib.blake2b(image_bytes, digest_size=16).digest(), brand_json)
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size, brand_json)
+    
+    async def _analyze_visual_quality(self, img: np.ndarray) -> VisualAnalysis:
         """Analyze visual quality using OpenCV"""
-        return self.image_analyzer.analyze_quality(image_path)
+        return await asyncio.to_thread(self.image_analyzer.analyze_quality, img)
     
     async def _analyze_colors(
         self,
-        image_path: str,
+        img: np.ndarray,
         brand_kit: Optional[BrandKit]
     ) -> ColorAnalysis:
         """Analyze color palette and brand alignment"""
-        return self.color_matcher.analyze_colors(image_path, brand_kit)
+        return await asyncio.to_thread(self.color_matcher.analyze_colors, img, brand_kit)
     
     async def _get_gemini_critique(
         self,
         image_path: str,
         brand_kit: Optional[BrandKit],
-        ad_description: Optional[str]
+        ad_description: Optional[str],
+        pil_image: Optional[Image.Image] = None,
+        img: Optional[np.ndarray] = None,
+        image_blob: Optional[Dict] = None
     ) -> Dict:
         """
         Get AI-powered critique using Gemini Vision.
         This is the core AI evaluation component.
         """
         
-        # Load image
-        image = Image.open(image_path)
+        # Prefer the original encoded bytes (no re-encode by the SDK),
+        # then the caller's decode, then the file
+        if image_blob is not None:
+            image = image_blob
+        else:
+            image = pil_image if pil_image is not None else Image.open(image_path)
         
-        # Build critique prompt
-        prompt = self._build_critique_prompt(brand_kit, ad_description)
+        # Build critique prompt: static prefix (cached per brand) + per-ad tail
+        prefix = self._build_critique_prefix(brand_kit)
+        tail = self._build_critique_tail(brand_kit, ad_description)
         
         try:
             # Generate critique using Gemini
-            response = self.model.generate_content([prompt, image])
+            contents = [tail, *await self._brand_reference_parts(brand_kit), image]
+            model = await self._critique_model_for(brand_kit, prefix)
+            response = await model.generate_content_async(contents)
             
             # Parse JSON response
             critique_data = self._parse_gemini_response(response.text)
@@ -123,7 +314,25 @@ class CritiqueEngine:
             
         except Exception as e:
             print(f"Error getting Gemini critique: {e}")
-            return self._get_fallback_critique(image_path)
+            return self._get_fallback_critique(image_path, img)
+    
+    async def _critique_model_for(self, brand_kit: Optional[BrandKit], prefix: str):
+        """Model whose system instruction is this brand's critique prefix"""
+        if self._context_cache is None:
+            return self.model
+        # Content hash in the key so an edited brand kit never reuses a stale prefix
+        digest = hashlib.blake2b(prefix.encode(), digest_size=8).hexdigest()
+        key = f"critique-{brand_kit.brand_id if brand_kit else 'no-brand'}-{digest}"
+        return await self._context_cache.get_model_async(key, prefix)
+    
+    async def _brand_reference_parts(self, brand_kit: Optional[BrandKit]) -> List:
+        """Brand logo as a Files API reference, if the kit has a local logo file"""
+        if self._brand_files is None or not brand_kit or not brand_kit.logo_url:
+            return []
+        logo_file = await self._brand_files.get_file_async(brand_kit.logo_url)
+        if logo_file is None:
+            return []
+        return ["Reference brand logo (compare the ad's logo usage against it):", logo_file]
     
     def _detect_ad_category(self, brand_kit: Optional[BrandKit], ad_description: Optional[str]) -> str:
         """
@@ -158,15 +367,11 @@ class CritiqueEngine:
             return max(category_scores.items(), key=lambda x: x[1])[0]
         return 'general'
     
-    def _build_critique_prompt(
-        self,
-        brand_kit: Optional[BrandKit],
-        ad_description: Optional[str]
-    ) -> str:
-        """Build a detailed prompt for Gemini to critique the ad with category-specific criteria"""
-        
-        # Detect ad category
-        category = self._detect_ad_category(brand_kit, ad_description)
+    def _build_critique_prefix(self, brand_kit: Optional[BrandKit]) -> str:
+        """
+        Static part of the critique prompt (role, brand context, rubric, output schema).
+        Identical for every ad of a brand, so it can live in a Gemini context cache.
+        """
         
         brand_context = ""
         if brand_kit:
@@ -177,79 +382,22 @@ Tone of Voice: {', '.join(brand_kit.tone_of_voice)}
 Brand Values: {', '.join(brand_kit.brand_values) if brand_kit.brand_values else 'Not specified'}
 """
         
-        # Category-specific evaluation criteria
-        category_guidelines = {
-            'fashion': """
-**Fashion-Specific Criteria:**
-- Model presentation and styling appropriateness
-- Clothing visibility and appeal
-- Seasonal/trend alignment
-- Lifestyle context and aspirational quality""",
-            
-            'tech': """
-**Tech-Specific Criteria:**
-- Product features clearly visible
-- Modern, innovative aesthetic
-- Clean, minimalist design preferred
-- UI/screen clarity if applicable""",
-            
-            'food': """
-**Food-Specific Criteria:**
-- Food presentation and appeal (looks delicious)
-- Freshness perception
-- Appropriate lighting and colors
-- Appetite appeal and mouth-watering quality""",
-            
-            'luxury': """
-**Luxury-Specific Criteria:**
-- Premium quality perception
-- Sophisticated composition
-- Exclusivity and refinement
-- Attention to detail and craftsmanship""",
-            
-            'eco': """
-**Eco/Sustainability-Specific Criteria:**
-- Natural, organic visual style
-- Green/earth tones appropriateness
-- Authenticity (avoid greenwashing)
-- Connection to nature/environment""",
-            
-            'health': """
-**Health/Wellness-Specific Criteria:**
-- Clean, trustworthy presentation
-- Professional medical imagery if applicable
-- Calm, reassuring aesthetic
-- Clarity of health benefits""",
-            
-            'general': """
-**General Advertising Criteria:**
-- Clear value proposition
-- Appropriate target audience appeal
-- Professional quality"""
-        }
-        
-        category_note = category_guidelines.get(category, category_guidelines['general'])
-        
-        prompt = f"""You are an expert Creative Director and Brand Compliance Officer evaluating a {category.upper()} advertisement.
+        return f"""You are an expert Creative Director and Brand Compliance Officer evaluating advertisements.
 
 {brand_context}
 
-Ad Description: {ad_description or 'Not provided'}
-
-{category_note}
-
-Analyze this advertisement and provide a structured critique across these dimensions:
+Analyze each advertisement and provide a structured critique across these dimensions:
 
 1. **Brand Alignment** (0-1 score):
    - Does it match the brand colors and visual identity?
-   - Is the tone appropriate for the brand and {category} industry?
+   - Is the tone appropriate for the brand and its industry?
    - Are brand elements (logo, typography) used correctly?
    
 2. **Visual Quality** (0-1 score):
    - Is the image sharp and well-composed?
    - Are there any visual artifacts or issues?
    - Is the layout professional and balanced?
-   - {category}-specific quality standards met?
+   - Industry-specific quality standards met?
    
 3. **Message Clarity** (0-1 score):
    - Is the product/service clearly visible?
@@ -366,7 +514,7 @@ Return ONLY a valid JSON object with this structure:
     "has_cta": false,
     "text_content": ["EcoFlow Water Bottle", "Sustainable Hydration"],
     "dominant_colors": ["#2E7D32", "#FFFFFF", "#66BB6A"],
-    "category_detected": "{category}",
+    "category_detected": "fashion|tech|food|luxury|eco|health|general",
     "estimated_resolution": "1920x1080",
     "composition_type": "product-centered"
   }},
@@ -383,7 +531,76 @@ Return ONLY a valid JSON object with this structure:
 
 Respond ONLY with valid JSON. No markdown, no explanations outside the JSON.
 """
-        return prompt
+    
+    def _build_critique_tail(
+        self,
+        brand_kit: Optional[BrandKit],
+        ad_description: Optional[str]
+    ) -> str:
+        """Per-ad part of the critique prompt with category-specific criteria"""
+        
+        # Detect ad category
+        category = self._detect_ad_category(brand_kit, ad_description)
+        
+        # Category-specific evaluation criteria
+        category_guidelines = {
+            'fashion': """
+**Fashion-Specific Criteria:**
+- Model presentation and styling appropriateness
+- Clothing visibility and appeal
+- Seasonal/trend alignment
+- Lifestyle context and aspirational quality""",
+            
+            'tech': """
+**Tech-Specific Criteria:**
+- Product features clearly visible
+- Modern, innovative aesthetic
+- Clean, minimalist design preferred
+- UI/screen clarity if applicable""",
+            
+            'food': """
+**Food-Specific Criteria:**
+- Food presentation and appeal (looks delicious)
+- Freshness perception
+- Appropriate lighting and colors
+- Appetite appeal and mouth-watering quality""",
+            
+            'luxury': """
+**Luxury-Specific Criteria:**
+- Premium quality perception
+- Sophisticated composition
+- Exclusivity and refinement
+- Attention to detail and craftsmanship""",
+            
+            'eco': """
+**Eco/Sustainability-Specific Criteria:**
+- Natural, organic visual style
+- Green/earth tones appropriateness
+- Authenticity (avoid greenwashing)
+- Connection to nature/environment""",
+            
+            'health': """
+**Health/Wellness-Specific Criteria:**
+- Clean, trustworthy presentation
+- Professional medical imagery if applicable
+- Calm, reassuring aesthetic
+- Clarity of health benefits""",
+            
+            'general': """
+**General Advertising Criteria:**
+- Clear value proposition
+- Appropriate target audience appeal
+- Professional quality"""
+        }
+        
+        category_note = category_guidelines.get(category, category_guidelines['general'])
+        
+        return f"""Evaluate this {category.upper()} advertisement (category_detected: "{category}").
+
+Ad Description: {ad_description or 'Not provided'}
+
+{category_note}
+"""
     
     def _parse_gemini_response(self, response_text: str) -> Dict:
         """Parse and validate Gemini's JSON response"""
@@ -395,15 +612,15 @@ Respond ONLY with valid JSON. No markdown, no explanations outside the JSON.
                 response_text = response_text.split("```")[1].split("```")[0]
             
             # Parse JSON
-            critique_data = json.loads(response_text.strip())
+            critique_data = msgspec.json.decode(response_text.strip())
             return critique_data
             
-        except json.JSONDecodeError as e:
+        except msgspec.DecodeError as e:
             print(f"Error parsing Gemini response: {e}")
             print(f"Response text: {response_text}")
             return self._get_fallback_critique()
     
-    def _get_fallback_critique(self, image_path: str = None) -> Dict:
+    def _get_fallback_critique(self, image_path: str = None, img: Optional[np.ndarray] = None) -> Dict:
         """
         Provide intelligent fallback critique using CV metrics if AI analysis fails.
         Uses actual image quality metrics instead of generic 0.5 scores.
@@ -414,10 +631,10 @@ Respond ONLY with valid JSON. No markdown, no explanations outside the JSON.
         clarity_score = 0.5
         feedback_notes = []
         
-        if image_path and os.path.exists(image_path):
+        if img is not None or (image_path and os.path.exists(image_path)):
             try:
                 # Analyze image quality using OpenCV
-                visual_analysis = self.image_analyzer.analyze_quality(image_path)
+                visual_analysis = self.image_analyzer.analyze_quality(img if img is not None else image_path)
                 
                 # Quality score based on sharpness and composition
                 quality_score = (visual_analysis.sharpness + visual_analysis.composition) / 2
@@ -585,8 +802,8 @@ Respond ONLY with valid JSON. No markdown, no explanations outside the JSON.
             ready_to_deploy=ready_to_deploy,
             detected_elements={
                 **ai_critique.get("detected_elements", {}),
-                "color_analysis": color_analysis.dict(),
-                "visual_analysis": visual_analysis.dict()
+                "color_analysis": msgspec.structs.asdict(color_analysis),
+                "visual_analysis": msgspec.structs.asdict(visual_analysis)
             },
             improvements_needed=improvements,
             approval_status="approved" if ready_to_deploy else "pending"
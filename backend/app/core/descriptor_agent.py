@@ -5,8 +5,8 @@ import google.generativeai as genai
 from typing import Dict, Any, List, Optional
 import base64
 from pathlib import Path
-import json
 import logging
+import msgspec
 
 logger = logging.getLogger(__name__)
 
@@ -167,7 +167,7 @@ Return ONLY the JSON object, no additional text."""
             if clean_text.endswith("```"):
                 clean_text = clean_text[:-3]
             
-            description = json.loads(clean_text.strip())
+            description = msgspec.json.decode(clean_text.strip())
             
             # Add metadata
             description["source"] = "gemini_vision"
@@ -175,7 +175,7 @@ Return ONLY the JSON object, no additional text."""
             
             return description
             
-        except json.JSONDecodeError as e:
+        except msgspec.DecodeError as e:
             logger.warning(f"Failed to parse JSON response: {e}")
             # Return raw text analysis
             return {
@@ -3,14 +3,14 @@ Multi-Agent Orchestrator - Manages the full workflow:
 Generate → Describe → Critique → Refine → Final Output
 """
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional
 from pathlib import Path
 import time
 from datetime import datetime
 
 from app.core.descriptor_agent import DescriptorAgent
 from app.core.critique_engine import CritiqueEngine
-from app.core.refinement_agent import RefinementAgent
+from app.core.refinement_agent import RefinementAgent, ServiceTier
 from app.services.generation_service import GenerationService
 
 logger = logging.getLogger(__name__)
@@ -65,7 +65,9 @@ class MultiAgentOrchestrator:
         media_type: str = "image",
         duration: int = 10,
         include_logo: bool = True,
-        brand_kit_data: Optional[Dict[str, Any]] = None
+        brand_kit_data: Optional[Dict[str, Any]] = None,
+        service_tier: ServiceTier = "standard",
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Run the full multi-agent pipeline
@@ -78,6 +80,8 @@ class MultiAgentOrchestrator:
             duration: Video duration in seconds (5-15)
             include_logo: Whether to include brand logo
             brand_kit_data: Optional brand kit data dictionary
+            service_tier: Gemini service tier for the refinement calls (standard, flex or priority)
+            progress_callback: Called with a small event dict as each stage starts/finishes
             
         Returns:
             Dictionary with complete workflow results including all iterations
@@ -85,6 +89,10 @@ class MultiAgentOrchestrator:
         workflow_start = time.time()
         iterations = []
         
+        def report(stage: str, iteration: int, **data):
+            if progress_callback:
+                progress_callback({"status": "running", "stage": stage, "iteration": iteration, **data})
+        
         logger.info(f"Starting multi-agent workflow for prompt: '{prompt[:50]}...' (media_type: {media_type})")
         
         current_prompt = prompt
@@ -103,6 +111,7 @@ class MultiAgentOrchestrator:
             
             # Step 1: Generate Ad (Image or Video)
             logger.info(f"[{iteration}] Generating {media_type} ad...")
+            report("generating", iteration, media_type=media_type)
             try:
                 # Create GenerateAdRequest object
                 from app.models.schemas import GenerateAdRequest
@@ -144,6 +153,7 @@ class MultiAgentOrchestrator:
             
             # Step 2: Describe Ad
             logger.info(f"[{iteration}] Describing ad components...")
+            report("describing", iteration, media_path=ad_path)
             try:
                 description = self.descriptor.describe_ad(ad_path)
                 iteration_result["description"] = description
@@ -157,6 +167,7 @@ class MultiAgentOrchestrator:
             
             # Step 3: Critique Ad
             logger.info(f"[{iteration}] Critiquing ad...")
+            report("critiquing", iteration)
             try:
                 critique = await self.critic.critique_ad(
                     image_path=ad_path,
@@ -188,6 +199,8 @@ class MultiAgentOrchestrator:
                 overall_score = 0.0
                 iteration_result["overall_score"] = overall_score
             
+            report("scored", iteration, score=overall_score, threshold=self.score_threshold)
+            
             # Check if we've met the threshold
             if overall_score >= self.score_threshold:
                 logger.info(f"[{iteration}] ✅ Score threshold met! ({overall_score:.2f} >= {self.score_threshold})")
@@ -199,13 +212,15 @@ class MultiAgentOrchestrator:
             # Step 4: Refine (if not last iteration)
             if iteration < self.max_iterations:
                 logger.info(f"[{iteration}] Score below threshold, refining...")
+                report("refining", iteration)
                 try:
-                    refinement = self.refinement.generate_improved_prompt(
+                    refinement = await self.refinement.generate_improved_prompt(
                         original_prompt=current_prompt,
                         critique_result=critique,
                         description=description,
                         brand_kit=brand_kit_data,
-                        iteration=iteration
+                        iteration=iteration,
+                        service_tier=service_tier
                     )
                     iteration_result["refinement"] = refinement
                     
@@ -1,12 +1,16 @@
 """
 Refinement Agent - Generates improved ad prompts based on critique feedback
 """
-import google.generativeai as genai
-from typing import Dict, Any, List, Optional
+from google import genai
+from google.genai import types
+from typing import Dict, Any, List, Literal, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Gemini service tier: 'flex' for non-urgent/CI runs (discounted, may queue), 'priority' for the user path
+ServiceTier = Literal["standard", "flex", "priority"]
+
 
 class RefinementAgent:
     """
@@ -16,20 +20,22 @@ class RefinementAgent:
     
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
+        self.model_name = 'gemini-2.0-flash'
         if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
+            # google-genai client: unlike the legacy SDK it can select the service tier per call
+            self.client = genai.Client(api_key=api_key)
         else:
-            self.model = None
+            self.client = None
             logger.warning("Refinement Agent initialized without Gemini API key - using fallback mode")
     
-    def generate_improved_prompt(
+    async def generate_improved_prompt(
         self,
         original_prompt: str,
         critique_result: Dict[str, Any],
         description: Dict[str, Any],
         brand_kit: Optional[Dict[str, Any]] = None,
-        iteration: int = 1
+        iteration: int = 1,
+        service_tier: ServiceTier = "standard"
     ) -> Dict[str, Any]:
         """
         Generate an improved ad generation prompt based on critique feedback
@@ -40,11 +46,12 @@ class RefinementAgent:
             description: The descriptor agent's analysis
             brand_kit: Optional brand kit information
             iteration: Current iteration number
+            service_tier: Gemini service tier for the refinement call
             
         Returns:
             Dictionary with improved prompt and refinement strategy
         """
-        if not self.model:
+        if not self.client:
             return self._fallback_refinement(original_prompt, critique_result)
         
         try:
@@ -58,7 +65,11 @@ class RefinementAgent:
             )
             
             # Generate improved prompt
-            response = self.model.generate_content(refinement_prompt)
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=refinement_prompt,
+                config=types.GenerateContentConfig(service_tier=service_tier)
+            )
             
             # Parse response
             result = self._parse_refinement(response.text, original_prompt)
@@ -168,7 +179,7 @@ Return ONLY the JSON object."""
     
     def _parse_refinement(self, response_text: str, original_prompt: str) -> Dict[str, Any]:
         """Parse refinement response"""
-        import json
+        import msgspec
         
         try:
             # Remove markdown code blocks
@@ -180,7 +191,7 @@ Return ONLY the JSON object."""
             if clean_text.endswith("```"):
                 clean_text = clean_text[:-3]
             
-            refinement = json.loads(clean_text.strip())
+            refinement = msgspec.json.decode(clean_text.strip())
             
             # Add metadata
             refinement["source"] = "gemini_refinement"
@@ -188,7 +199,7 @@ Return ONLY the JSON object."""
             
             return refinement
             
-        except json.JSONDecodeError as e:
+        except msgspec.DecodeError as e:
             logger.warning(f"Failed to parse refinement JSON: {e}")
             # Extract improved prompt from text
             return {
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
+import msgspec
 from datetime import datetime
 from enum import Enum
 
@@ -14,6 +15,8 @@ class ScoreLevel(str, Enum):
 
 class BrandKit(BaseModel):
     """Brand guidelines and identity information"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     brand_id: str
     brand_name: str
     primary_colors: List[str] = Field(description="Hex color codes")
@@ -37,7 +40,7 @@ class CritiqueScore(BaseModel):
 
 class AdCritique(BaseModel):
     """Complete critique analysis of an ad"""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(extra='ignore', frozen=True)
     
     critique_id: str
     ad_url: str
@@ -64,6 +67,8 @@ class AdCritique(BaseModel):
 
 class GenerateAdRequest(BaseModel):
     """Request to generate an ad"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     brand_id: str
     product_name: str
     product_description: str
@@ -71,12 +76,15 @@ class GenerateAdRequest(BaseModel):
     style: str = "modern"  # modern, minimal, bold, elegant
     duration: int = Field(default=10, ge=5, le=15, description="Duration in seconds for video")
     media_type: str = "image"  # image or video
+    image_format: Literal["png", "jpeg"] = "png"
     brand_logo_path: Optional[str] = None  # Path to uploaded brand logo
     product_image_path: Optional[str] = None  # Path to uploaded product image
 
 
 class CritiqueRequest(BaseModel):
     """Request to critique an ad"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     brand_id: Optional[str] = None
     ad_description: Optional[str] = None
     check_dimensions: List[str] = ["brand", "quality", "safety", "clarity"]
@@ -88,18 +96,34 @@ class ImproveAdRequest(BaseModel):
     improvement_iterations: int = Field(default=1, ge=1, le=3)
 
 
-class ColorAnalysis(BaseModel):
-    """Color analysis results"""
+class AdCopy(BaseModel):
+    """Structured ad copy returned by Gemini (used as its response_schema)"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    headline: str
+    tagline: str
+    description: str
+    color: Optional[str] = None  # Background HEX, design variant only
+    style: Optional[str] = None  # modern, minimalist, bold, elegant, playful
+
+
+class ImageAdCopy(AdCopy):
+    """Ad copy plus the enhanced Imagen prompt, produced in one Gemini call"""
+    imagen_prompt: str
+
+
+class ColorAnalysis(msgspec.Struct, frozen=True):
+    """Color analysis results (internal value object, slotted)"""
     dominant_colors: List[str]
     color_palette: List[str]
-    brand_color_match: float = Field(ge=0.0, le=1.0)
-    color_harmony: float = Field(ge=0.0, le=1.0)
+    brand_color_match: float
+    color_harmony: float
 
 
-class VisualAnalysis(BaseModel):
-    """Visual quality analysis results"""
-    sharpness: float = Field(ge=0.0, le=1.0)
-    composition: float = Field(ge=0.0, le=1.0)
+class VisualAnalysis(msgspec.Struct, frozen=True):
+    """Visual quality analysis results (internal value object, slotted)"""
+    sharpness: float
+    composition: float
     has_watermark: bool
     has_artifacts: bool
     resolution: Dict[str, int]
@@ -2,15 +2,19 @@
 Brand kit management service
 """
 
-import json
+import asyncio
 import os
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from fastapi import UploadFile
 
 from config import settings
 from app.models.schemas import BrandKit
 
+# Parsed listings per brand-kit directory, keyed by the directory's mtime
+# (shared by every BrandService instance in the process)
+_LIST_CACHE: Dict[str, Tuple[int, List[BrandKit]]] = {}
+
 
 class BrandService:
     """Manages brand kits and brand assets"""
@@ -27,8 +31,12 @@ class BrandService:
         )
         
         try:
-            with open(file_path, 'w') as f:
-                json.dump(brand_kit.dict(), f, indent=2, default=str)
+            # Write-then-rename: atomic, and bumps the directory mtime the listing cache keys on
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(brand_kit.model_dump_json(indent=2))
+            os.replace(tmp_path, file_path)
+            _LIST_CACHE.pop(self.brand_kits_path, None)
             return True
         except Exception as e:
             print(f"Error saving brand kit: {e}")
@@ -37,41 +45,63 @@ class BrandService:
     async def get_brand_kit(self, brand_id: str) -> Optional[BrandKit]:
         """Load brand kit from disk"""
         file_path = os.path.join(self.brand_kits_path, f"{brand_id}.json")
-        
-        if not os.path.exists(file_path):
-            return None
-        
+        # Off the event loop, so concurrent loads actually overlap
+        return await asyncio.to_thread(self._read_brand_kit, file_path)
+    
+    @staticmethod
+    def _read_brand_kit(file_path: str) -> Optional[BrandKit]:
+        """Blocking read + validation of one brand kit file"""
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            return BrandKit(**data)
+            # Validate straight from the raw JSON with pydantic-core's compiled validator
+            with open(file_path, 'rb') as f:
+                return BrandKit.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
         except Exception as e:
             print(f"Error loading brand kit: {e}")
             return None
     
+    def brand_kit_version(self, brand_id: str) -> Optional[int]:
+        """Version of one brand kit (file mtime in ns), or None if it doesn't exist"""
+        try:
+            return os.stat(os.path.join(self.brand_kits_path, f"{brand_id}.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def listing_version(self) -> int:
+        """Version of the brand-kit listing (directory mtime in ns)"""
+        return os.stat(self.brand_kits_path).st_mtime_ns
+    
     async def list_brand_kits(self) -> List[BrandKit]:
         """List all brand kits"""
-        brand_kits = []
+        version = self.listing_version()
+        cached = _LIST_CACHE.get(self.brand_kits_path)
+        if cached and cached[0] == version:
+            return list(cached[1])
         
-        for filename in os.listdir(self.brand_kits_path):
-            if filename.endswith('.json'):
-                brand_id = filename.replace('.json', '')
-                brand_kit = await self.get_brand_kit(brand_id)
-                if brand_kit:
-                    brand_kits.append(brand_kit)
-        
-        return brand_kits
+        # One executor hop for the whole directory instead of one per file
+        brand_kits = await asyncio.to_thread(self._read_brand_kits, self.brand_kits_path)
+        _LIST_CACHE[self.brand_kits_path] = (version, brand_kits)
+        return list(brand_kits)
+    
+    @classmethod
+    def _read_brand_kits(cls, brand_kits_path: str) -> List[BrandKit]:
+        """Blocking batch read of every brand kit in a directory"""
+        with os.scandir(brand_kits_path) as it:
+            paths = [e.path for e in it if e.name.endswith('.json') and e.is_file()]
+        brand_kits = (cls._read_brand_kit(path) for path in paths)
+        return [kit for kit in brand_kits if kit]
     
     async def delete_brand_kit(self, brand_id: str) -> bool:
         """Delete brand kit"""
         file_path = os.path.join(self.brand_kits_path, f"{brand_id}.json")
         
-        if not os.path.exists(file_path):
-            return False
-        
         try:
             os.remove(file_path)
+            _LIST_CACHE.pop(self.brand_kits_path, None)
             return True
+        except FileNotFoundError:
+            return False
         except Exception as e:
             print(f"Error deleting brand kit: {e}")
             return False
@@ -2,24 +2,233 @@
 Ad generation service using Google Vertex AI
 """
 
+import asyncio
+import functools
+import hashlib
+import io
 import os
+import pathlib
 import uuid
+import weakref
 import logging
 import requests
-from typing import Dict, Any, Optional
-from google.cloud import aiplatform
-from vertexai.preview.vision_models import ImageGenerationModel
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple, Type, TypeVar
+from cachetools import TTLCache
 import google.generativeai as genai
 from google.oauth2 import service_account
 import vertexai
 from vertexai.preview.vision_models import ImageGenerationModel
+from PIL import Image, ImageDraw, ImageFont
 
 from config import settings
-from app.models.schemas import GenerateAdRequest
+from app.models.schemas import AdCopy, GenerateAdRequest, ImageAdCopy
 from app.services.brand_service import BrandService
 
 logger = logging.getLogger(__name__)
 
+# Seconds a loaded brand kit is reused before re-reading it
+_BRAND_TTL = 300
+
+# Seconds a generated copy response is reused for an identical request
+_COPY_TTL = 3600
+
+# Fixed tail of the ad generation prompt
+_PROMPT_REQUIREMENTS = """Requirements:
+- Show the product prominently
+- Include the tagline if provided
+- Use brand colors
+- Clean, professional composition
+- No watermarks or artifacts
+"""
+
+# Static instructions shared by every text-model call; sent as the system instruction together
+# with the brand block, so each call's message only carries the task name and the user request.
+# (At ~300 tokens this prefix is far below Gemini's explicit-caching minimum, so it is not context-cached.)
+_AD_SYSTEM_PROMPT = """You are an advertising creative assistant. Each message names one TASK and gives the user request.
+
+Ad copy always consists of:
+1. A catchy headline (max 6 words)
+2. A compelling tagline (max 10 words)
+3. A brief description (max 15 words)
+
+TASK IMAGEN_PROMPT_AND_COPY:
+Return JSON with two sections.
+Section 1 - "imagen_prompt": a detailed Imagen 3 prompt (max 1000 characters) for a professional advertisement image. Include:
+- Main subject/product
+- Setting/background (with the brand colors, if provided)
+- Colors and mood
+- Text placement areas (but NO actual text - Imagen can't render text reliably)
+- Composition and style
+- Professional photography quality
+Start directly with the prompt, no explanations.
+Section 2 - "headline", "tagline", "description": the ad copy.
+
+TASK AD_COPY_WITH_DESIGN:
+Return JSON with the ad copy ("headline", "tagline", "description"), plus:
+- "color": primary background color as HEX code (MUST use one of the brand colors, if provided; otherwise based on product/theme, e.g., #4A90E2 for tech, #2E7D32 for eco, #D32F2F for food, #7B1FA2 for luxury)
+- "style": design style (modern/minimalist/bold/elegant/playful)"""
+
+_TEXT_MODEL = 'gemini-2.0-flash'
+
+# Prompts at least this long that already mention art direction skip Gemini enhancement
+_DETAILED_PROMPT_CHARS = 800
+_DETAIL_KEYWORDS = ("composition", "lighting", "photography", "mood")
+
+# Dedicated pools for blocking work, shared by every GenerationService instance
+# (the multi-agent route builds a new service per request).
+# Vertex calls are quota-bound; image encode/write is local CPU + disk.
+_VERTEX_POOL = ThreadPoolExecutor(max_workers=settings.vertex_concurrency, thread_name_prefix='vertex')
+_IO_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='img-io')
+
+# Response caches shared by every GenerationService instance (the multi-agent route builds one per request)
+# Brand kits as (file mtime, kit): an edited or deleted kit is noticed on the next lookup
+_BRAND_CACHE: TTLCache = TTLCache(maxsize=256, ttl=_BRAND_TTL)
+# Brand-kit loads in flight, so concurrent misses share one read; entries leave when the load ends
+_BRAND_LOADS: Dict[Tuple[str, int], asyncio.Future] = {}
+# Validated ad copy only, so a malformed reply is retried rather than replayed for the whole TTL
+_COPY_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=_COPY_TTL)
+# Generation prompts, keyed on every request and brand field they are built from,
+# so an edited brand kit gets a new entry (the TTL only bounds memory)
+_PROMPT_CACHE: TTLCache = TTLCache(maxsize=256, ttl=_BRAND_TTL)
+
+_CopyT = TypeVar('_CopyT', bound=AdCopy)
+
+# Cap on in-flight variant generations, shared across requests: one semaphore per event loop,
+# since a semaphore is bound to the loop that first waits on it (see _generation_slots)
+_GENERATION_SLOTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _generation_slots() -> asyncio.Semaphore:
+    """The generation semaphore of the running loop (the app's loop in production)"""
+    loop = asyncio.get_running_loop()
+    semaphore = _GENERATION_SLOTS.get(loop)
+    if semaphore is None:
+        semaphore = _GENERATION_SLOTS[loop] = asyncio.Semaphore(settings.max_concurrent_generations)
+    return semaphore
+
+
+@functools.lru_cache(maxsize=1)
+def _init_sdks() -> None:
+    """
+    One-time process setup: credentials, Vertex AI / Gemini SDK init and the output
+    directory (the multi-agent route builds a GenerationService per request)
+    """
+    if settings.google_application_credentials:
+        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = settings.google_application_credentials
+    
+    # Without a project, leave Vertex AI uninitialized rather than trigger ADC project discovery
+    if settings.google_cloud_project:
+        vertexai.init(
+            project=settings.google_cloud_project,
+            location=settings.vertex_ai_location
+        )
+    if settings.gemini_api_key:
+        genai.configure(api_key=settings.gemini_api_key)
+    
+    os.makedirs(settings.generated_ads_dir, exist_ok=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _get_text_model(system_instruction: str) -> genai.GenerativeModel:
+    """Gemini text model per static prefix (brand block included), built once per process"""
+    return genai.GenerativeModel(_TEXT_MODEL, system_instruction=system_instruction)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_image_model(name: str) -> ImageGenerationModel:
+    """Load an Imagen model once per process"""
+    return ImageGenerationModel.from_pretrained(name)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_video_model(name: str):
+    """Load a Veo model once per process"""
+    from vertexai.preview.vision_models import VideoGenerationModel
+    return VideoGenerationModel.from_pretrained(name)
+
+
+@functools.lru_cache(maxsize=32)
+def _font(family: str, size: int) -> ImageFont.ImageFont:
+    """Parse a font once per (family, size); falls back to PIL's default font"""
+    try:
+        return ImageFont.truetype(family, size)
+    except OSError:
+        return _default_font()
+
+
+@functools.lru_cache(maxsize=1)
+def _default_font() -> ImageFont.ImageFont:
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=256)
+def _color_meta(bg_hex: str) -> Tuple[str, str]:
+    """(text_color, accent_color) that stay readable on a #RRGGBB background"""
+    try:
+        hex_digits = bg_hex[1:7]
+        if len(hex_digits) != 6:
+            raise ValueError(bg_hex)
+        rgb = int(hex_digits, 16)
+    except ValueError:
+        return 'white', '#FFD700'
+    r, g, b = (rgb >> 16) & 0xFF, (rgb >> 8) & 0xFF, rgb & 0xFF
+    # Integer-only perceived brightness, scaled by 1000
+    brightness_x1000 = r * 299 + g * 587 + b * 114
+    if brightness_x1000 < 128_000:
+        return 'white', '#FFD700'
+    return 'black', '#FF6B00'
+
+
+@functools.lru_cache(maxsize=32)
+def _base_canvas(color: str) -> Image.Image:
+    """Solid 1024x1024 background, allocated once per color; callers draw on a .copy()"""
+    return Image.new('RGB', (1024, 1024), color=color)
+
+
+# Scratch context used only to measure text extents
+_MEASURE = ImageDraw.Draw(Image.new('L', (1, 1)))
+
+
+def _blit_text(img: Image.Image, x: float, y: int, text: str, font: ImageFont.ImageFont, fill: str) -> None:
+    """
+    Rasterize text on an RGBA layer sized to its bounding box and blend only
+    that region into img, instead of drawing across the full canvas
+    """
+    left, top, right, bottom = _MEASURE.multiline_textbbox((0, 0), text, font=font)
+    layer = Image.new('RGBA', (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).multiline_text((-left, -top), text, font=font, fill=fill)
+    img.paste(layer, (round(x) + left, y + top), layer)
+
+
+def _json_config(schema: type) -> Dict[str, Any]:
+    """Gemini JSON-mode generation config for a pydantic response schema"""
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def _is_detailed_prompt(prompt: str) -> bool:
+    """True for long, already art-directed prompts that Imagen can take as-is"""
+    if len(prompt) <= _DETAILED_PROMPT_CHARS:
+        return False
+    lowered = prompt.lower()
+    return any(keyword in lowered for keyword in _DETAIL_KEYWORDS)
+
+
+def _encode_image(img: Image.Image, image_format: str = "png") -> bytes:
+    """Encode an ad image: fast-zlib PNG by default, or JPEG (q90) for opaque ads"""
+    buf = io.BytesIO()
+    if image_format == "jpeg":
+        img.convert('RGB').save(buf, format='JPEG', quality=90, optimize=True, progressive=True)
+    else:
+        img.save(buf, format='PNG', optimize=False, compress_level=1)
+    return buf.getvalue()
+
+
+def _image_ext(image_format: str) -> str:
+    return "jpg" if image_format == "jpeg" else "png"
+
 
 class GenerationService:
     """
@@ -30,17 +239,55 @@ class GenerationService:
     
     def __init__(self):
         """Initialize Vertex AI with authentication"""
-        # Set up authentication
-        if settings.google_application_credentials:
-            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = settings.google_application_credentials
+        _init_sdks()
+        self.brand_service = BrandService()
+    
+    @staticmethod
+    async def _run_vertex(fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking Vertex AI SDK call (Imagen/Veo) on the Vertex pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_VERTEX_POOL, functools.partial(fn, *args, **kwargs))
+    
+    @staticmethod
+    async def _run_io(fn: Callable, *args, **kwargs) -> Any:
+        """Run blocking image encode / file IO on the IO pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_IO_POOL, functools.partial(fn, *args, **kwargs))
+    
+    def close(self) -> None:
+        """Shut down the shared executors (call once on app shutdown)"""
+        _VERTEX_POOL.shutdown(wait=False, cancel_futures=True)
+        _IO_POOL.shutdown(wait=False, cancel_futures=True)
+    
+    async def _cached_brand_kit(self, brand_id: str) -> Optional[Any]:
+        """
+        Return a brand kit from the cache while its file is unchanged, reloading it
+        after an edit and dropping it once deleted. Concurrent misses (e.g. variant
+        fan-out) share a single load.
+        """
+        version = self.brand_service.brand_kit_version(brand_id)
+        if version is None:
+            _BRAND_CACHE.pop(brand_id, None)
+            return None
         
-        if settings.google_cloud_project:
-            aiplatform.init(
-                project=settings.google_cloud_project,
-                location=settings.vertex_ai_location
-            )
+        cached = _BRAND_CACHE.get(brand_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
         
-        self.brand_service = BrandService()
+        key = (brand_id, version)
+        load = _BRAND_LOADS.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._load_brand_kit(brand_id, version))
+            _BRAND_LOADS[key] = load
+            load.add_done_callback(lambda _: _BRAND_LOADS.pop(key, None))
+        # Shielded: a cancelled caller must not cancel the load other callers wait on
+        return await asyncio.shield(load)
+    
+    async def _load_brand_kit(self, brand_id: str, version: int) -> Optional[Any]:
+        brand_kit = await self.brand_service.get_brand_kit(brand_id)
+        if brand_kit is not None:
+            _BRAND_CACHE[brand_id] = (version, brand_kit)
+        return brand_kit
     
     async def generate_ad(self, request: GenerateAdRequest) -> Dict[str, Any]:
         """
@@ -53,7 +300,7 @@ class GenerationService:
         
         # Get brand kit for context
         logger.info(f"🔍 Loading brand kit with ID: {request.brand_id}")
-        brand_kit = await self.brand_service.get_brand_kit(request.brand_id)
+        brand_kit = await self._cached_brand_kit(request.brand_id)
         logger.info(f"🔍 Brand kit loaded: {brand_kit is not None}, type: {type(brand_kit) if brand_kit else 'None'}")
         if brand_kit:
             logger.info(f"🔍 Brand: {brand_kit.brand_name if hasattr(brand_kit, 'brand_name') else 'unknown'}, Colors: {brand_kit.primary_colors if hasattr(brand_kit, 'primary_colors') else 'none'}")
@@ -76,7 +323,7 @@ class GenerationService:
         
         Returns 3 variants (A, B, C) for comparison
         """
-        brand_kit = await self.brand_service.get_brand_kit(request.brand_id)
+        brand_kit = await self._cached_brand_kit(request.brand_id)
         base_prompt = self._build_generation_prompt(request, brand_kit)
         
         # Create prompt variations
@@ -86,29 +333,37 @@ class GenerationService:
             {"id": "C", "style": "dynamic and energetic", "emphasis": "call-to-action clarity"}
         ]
         
-        results = []
-        for variant in variations:
+        # Dispatch all variants concurrently; the process-wide cap keeps every request within Vertex AI quotas
+        semaphore = _generation_slots()
+        
+        async def run_variant(variant: Dict[str, str]) -> Dict[str, Any]:
             # Modify prompt for each variant
             modified_prompt = f"{base_prompt}\n\nStyle emphasis: {variant['style']}, Focus on: {variant['emphasis']}"
-            
-            try:
+            async with semaphore:
                 if request.media_type == "image":
-                    result = await self._generate_image(modified_prompt, request, brand_kit)
-                else:
-                    result = await self._generate_video(modified_prompt, request)
-                
+                    return await self._generate_image(modified_prompt, request, brand_kit)
+                return await self._generate_video(modified_prompt, request)
+        
+        outcomes = await asyncio.gather(
+            *(run_variant(variant) for variant in variations),
+            return_exceptions=True
+        )
+        
+        results = []
+        for variant, outcome in zip(variations, outcomes):
+            if isinstance(outcome, Exception):
                 results.append({
                     "variant_id": variant["id"],
-                    "variant_name": f"Variant {variant['id']}",
-                    "style_emphasis": variant["style"],
-                    "focus": variant["emphasis"],
-                    **result
+                    "error": str(outcome),
+                    "success": False
                 })
-            except Exception as e:
+            else:
                 results.append({
                     "variant_id": variant["id"],
-                    "error": str(e),
-                    "success": False
+                    "variant_name": f"Variant {variant['id']}",
+                    "style_emphasis": variant["style"],
+                    "focus": variant["emphasis"],
+                    **outcome
                 })
         
         return {
@@ -118,39 +373,97 @@ class GenerationService:
             "base_prompt": base_prompt
         }
     
+    def _static_prefix(self, brand_kit: Optional[object]) -> str:
+        """Static instructions plus the brand block - identical for every call of a brand"""
+        if not brand_kit:
+            return _AD_SYSTEM_PROMPT
+        
+        brand_colors = brand_kit.primary_colors if hasattr(brand_kit, 'primary_colors') else []
+        brand_tone = brand_kit.tone_of_voice if hasattr(brand_kit, 'tone_of_voice') else []
+        return (
+            f"{_AD_SYSTEM_PROMPT}\n\n"
+            f"BRAND CONTEXT:\n"
+            f"Brand: {getattr(brand_kit, 'brand_name', 'Brand')}\n"
+            f"Brand colors: {', '.join(brand_colors) or 'Not specified'}\n"
+            f"Tone: {', '.join(brand_tone) or 'Not specified'}"
+        )
+    
+    @staticmethod
+    def _dynamic_tail(task: str, prompt: str) -> str:
+        """Per-call part of a text-model request"""
+        return f'TASK {task}\nUser request: "{prompt}"'
+    
+    def _text_model_for(self, brand_kit: Optional[object]):
+        """Gemini text model with this brand's static prefix as system instruction"""
+        # Keyed by the prefix text itself, so an edited brand kit never reuses a stale model
+        return _get_text_model(self._static_prefix(brand_kit))
+    
+    async def _generate_copy(
+        self,
+        brand_kit: Optional[object],
+        task: str,
+        prompt: str,
+        schema: Type[_CopyT]
+    ) -> _CopyT:
+        """
+        Run one JSON-mode text-model task and validate the reply against schema,
+        reusing the validated copy for an identical (brand prefix, task, request)
+        within the copy TTL. Raises if the reply does not validate (nothing is cached).
+        """
+        tail = self._dynamic_tail(task, prompt)
+        key = hashlib.blake2b(
+            f"{self._static_prefix(brand_kit)}\x00{tail}".encode(),
+            digest_size=16
+        ).digest()
+        ad_copy = _COPY_CACHE.get(key)
+        if ad_copy is not None:
+            return ad_copy
+        
+        model = self._text_model_for(brand_kit)
+        response = await model.generate_content_async(tail, generation_config=_json_config(schema))
+        ad_copy = schema.model_validate_json(response.text)
+        _COPY_CACHE[key] = ad_copy
+        return ad_copy
+    
     def _build_generation_prompt(
         self,
         request: GenerateAdRequest,
         brand_kit: Any
     ) -> str:
         """Build a prompt for ad generation"""
+        key = (
+            request.product_name,
+            request.product_description,
+            request.tagline,
+            request.style,
+            (
+                brand_kit.brand_name,
+                tuple(brand_kit.primary_colors),
+                tuple(brand_kit.tone_of_voice)
+            ) if brand_kit else None
+        )
+        prompt = _PROMPT_CACHE.get(key)
+        if prompt is not None:
+            return prompt
         
-        brand_context = ""
+        parts = [f"Create a {request.style} advertisement for {request.product_name}.", ""]
         if brand_kit:
-            colors = ', '.join(brand_kit.primary_colors)
-            tone = ', '.join(brand_kit.tone_of_voice)
-            brand_context = f"""
-Brand: {brand_kit.brand_name}
-Colors: {colors}
-Tone: {tone}
-"""
-        
-        prompt = f"""Create a {request.style} advertisement for {request.product_name}.
-
-{brand_context}
-
-Product: {request.product_name}
-Description: {request.product_description}
-Tagline: {request.tagline or 'Not specified'}
-
-Style: {request.style}, professional, high-quality
-Requirements:
-- Show the product prominently
-- Include the tagline if provided
-- Use brand colors
-- Clean, professional composition
-- No watermarks or artifacts
-"""
+            parts.extend([
+                f"Brand: {brand_kit.brand_name}",
+                f"Colors: {', '.join(brand_kit.primary_colors)}",
+                f"Tone: {', '.join(brand_kit.tone_of_voice)}",
+                ""
+            ])
+        parts.extend([
+            f"Product: {request.product_name}",
+            f"Description: {request.product_description}",
+            f"Tagline: {request.tagline or 'Not specified'}",
+            "",
+            f"Style: {request.style}, professional, high-quality",
+            _PROMPT_REQUIREMENTS
+        ])
+        prompt = "\n".join(parts)
+        _PROMPT_CACHE[key] = prompt
         return prompt
     
     async def _generate_image(
@@ -170,92 +483,60 @@ Requirements:
             brand_colors = brand_kit.primary_colors if hasattr(brand_kit, 'primary_colors') else []
             brand_name = brand_kit.brand_name if hasattr(brand_kit, 'brand_name') else "Brand"
         
+        ad_copy: Optional[AdCopy] = None
         try:
-            # Initialize Vertex AI
-            vertexai.init(
-                project=settings.google_cloud_project,
-                location=settings.vertex_ai_location
-            )
-            
-            # Use Gemini to enhance the prompt with ad-specific details and brand colors
-            import google.generativeai as genai
-            genai.configure(api_key=settings.gemini_api_key)
-            text_model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            brand_context = ""
-            if brand_colors:
-                brand_context = f"\nBrand colors to use: {', '.join(brand_colors)}"
-            
-            enhancement_prompt = f"""Based on this user request: "{prompt}"
-{brand_context}
-
-Create a detailed Imagen 3 prompt for a professional advertisement image. Include:
-- Main subject/product
-- Setting/background{"with brand colors: " + ", ".join(brand_colors) if brand_colors else ""}
-- Colors and mood
-- Text placement areas (but NO actual text - Imagen can't render text reliably)
-- Composition and style
-- Professional photography quality
-
-Format as a single detailed prompt (max 1000 characters) suitable for Imagen 3 image generation.
-Start directly with the prompt, no explanations."""
-
-            response = text_model.generate_content(enhancement_prompt)
-            enhanced_prompt = response.text.strip()
-            
-            logger.info(f"Enhanced Imagen prompt: {enhanced_prompt}")
-            
             # Generate image using Imagen 3
-            image_model = ImageGenerationModel.from_pretrained("imagegeneration@006")  # Imagen 3
-            
-            images = image_model.generate_images(
-                prompt=enhanced_prompt,
+            image_model = _get_image_model(settings.imagen_model)  # Imagen 3
+            render = functools.partial(
+                self._run_vertex,
+                image_model.generate_images,
                 number_of_images=1,
                 aspect_ratio="1:1",  # Square format for ads
                 safety_filter_level="block_some",
                 person_generation="allow_adult"
             )
             
+            if _is_detailed_prompt(prompt):
+                # Already detailed: send it to Imagen as-is and fetch only the copy, alongside the render
+                enhanced_prompt = prompt[:1000]
+                images, ad_copy = await asyncio.gather(
+                    render(prompt=enhanced_prompt),
+                    self._generate_copy(brand_kit, "AD_COPY_WITH_DESIGN", prompt, AdCopy)
+                )
+            else:
+                # One JSON-mode Gemini call returns both the enhanced Imagen prompt and the ad copy
+                ad_copy = await self._generate_copy(
+                    brand_kit,
+                    "IMAGEN_PROMPT_AND_COPY",
+                    prompt,
+                    ImageAdCopy
+                )
+                enhanced_prompt = ad_copy.imagen_prompt.strip()
+                
+                logger.info(f"Enhanced Imagen prompt: {enhanced_prompt}")
+                
+                images = await render(prompt=enhanced_prompt)
+            
             # Save the generated image
             image_id = str(uuid.uuid4())
             image_path = os.path.join(
                 settings.generated_ads_dir,
-                f"{image_id}.png"
+                f"{image_id}.{_image_ext(request.image_format)}"
             )
             
-            os.makedirs(settings.generated_ads_dir, exist_ok=True)
-            
-            # Save the first generated image
-            images[0].save(image_path)
-            
-            # Generate ad copy separately using Gemini
-            ad_copy_prompt = f"""Based on this user request: "{prompt}"
-
-Generate ONLY the following for an advertisement:
-1. A catchy headline (max 6 words)
-2. A compelling tagline (max 10 words)
-3. A brief description (max 15 words)
-
-Format as:
-HEADLINE: [text]
-TAGLINE: [text]
-DESCRIPTION: [text]"""
-
-            copy_response = text_model.generate_content(ad_copy_prompt)
-            ai_copy = copy_response.text
-            
-            # Parse the AI response
-            headline = "NEW PRODUCT"
-            tagline = ""
-            description = ""
+            # Imagen already returns encoded PNG bytes; write them as-is unless JPEG was requested
+            image_bytes = getattr(images[0], '_image_bytes', None)
+            if image_bytes is None:
+                image_path = os.path.splitext(image_path)[0] + ".png"
+                await self._run_vertex(images[0].save, image_path)
+            else:
+                if request.image_format == "jpeg":
+                    image_bytes = await self._run_io(
+                        _encode_image, Image.open(io.BytesIO(image_bytes)), "jpeg"
+                    )
+                await self._run_io(pathlib.Path(image_path).write_bytes, image_bytes)
             
-            for line in ai_copy.split('\n'):
-                if 'HEADLINE:' in line.upper():
-                    headline = line.split(':', 1)[1].strip()
-                elif 'TAGLINE:' in line.upper():
-                    tagline = line.split(':', 1)[1].strip()
-                elif 'DESCRIPTION:' in line.upper():
-                    description = line.split(':', 1)[1].strip()
+            headline, tagline, description = ad_copy.headline, ad_copy.tagline, ad_copy.description
             
             logger.info(f"Generated ad image with Imagen 3: {image_path}")
             logger.info(f"AI-generated copy - Headline: {headline}, Tagline: {tagline}")
@@ -279,23 +560,23 @@ DESCRIPTION: [text]"""
             logger.exception(e)
             
             # Fallback to PIL if Imagen fails
-            return await self._generate_image_fallback(prompt, request, brand_kit)
+            # Reuse the copy if Gemini already produced it before Imagen failed
+            return await self._generate_image_fallback(prompt, request, brand_kit, copy=ad_copy)
     
     async def _generate_image_fallback(
         self,
         prompt: str,
         request: GenerateAdRequest,
-        brand_kit: Optional[object] = None
+        brand_kit: Optional[object] = None,
+        copy: Optional[AdCopy] = None
     ) -> Dict[str, Any]:
         """
         Fallback PIL-based image generation if Imagen fails
-        Uses brand kit colors if available
+        Uses brand kit colors if available; skips the Gemini copy call when copy is given
         """
         logger.info(f"🎨 PIL FALLBACK CALLED - brand_kit received: {brand_kit is not None}")
         try:
-            from PIL import Image, ImageDraw, ImageFont
             import textwrap
-            import google.generativeai as genai
             
             # Extract brand colors
             brand_colors = []
@@ -306,109 +587,56 @@ DESCRIPTION: [text]"""
                 brand_name = brand_kit.brand_name if hasattr(brand_kit, 'brand_name') else "Brand"
                 logger.info(f"🎨 Extracted from brand kit - Name: {brand_name}, Colors: {brand_colors}")
             
-            # Use Gemini to generate creative ad copy
-            genai.configure(api_key=settings.gemini_api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            # Build prompt with brand context
-            color_context = ""
-            if brand_colors:
-                color_context = f"\nUse one of these brand colors: {', '.join(brand_colors)}"
-            
-            ad_copy_prompt = f"""Based on this user request: "{prompt}"
-{color_context}
-
-Generate ONLY the following for an advertisement:
-1. A catchy headline (max 6 words)
-2. A compelling tagline (max 10 words)
-3. A brief description (max 15 words)
-4. Primary background color as HEX code{' (MUST use one of: ' + ', '.join(brand_colors) + ')' if brand_colors else ' (based on product/theme, e.g., #4A90E2 for tech, #2E7D32 for eco, #D32F2F for food, #7B1FA2 for luxury)'}
-5. Design style (modern/minimalist/bold/elegant/playful)
-
-Format as:
-HEADLINE: [text]
-TAGLINE: [text]
-DESCRIPTION: [text]
-COLOR: [hex code]
-STYLE: [style]"""
-
-            response = model.generate_content(ad_copy_prompt)
-            ai_response = response.text
-            
-            # Parse response
-            headline = "NEW PRODUCT"
-            tagline = ""
-            description = ""
+            # Use Gemini to generate creative ad copy, unless the Imagen path already did
+            if copy is not None:
+                ad_copy = copy
+            else:
+                ad_copy = await self._generate_copy(
+                    brand_kit,
+                    "AD_COPY_WITH_DESIGN",
+                    prompt,
+                    AdCopy
+                )
+            headline, tagline, description = ad_copy.headline, ad_copy.tagline, ad_copy.description
+            style = (ad_copy.style or "modern").lower()
             bg_color = brand_colors[0] if brand_colors else "#4A90E2"  # Use first brand color or default
-            style = "modern"
-            
-            for line in ai_response.split('\n'):
-                if 'HEADLINE:' in line.upper():
-                    headline = line.split(':', 1)[1].strip()
-                elif 'TAGLINE:' in line.upper():
-                    tagline = line.split(':', 1)[1].strip()
-                elif 'DESCRIPTION:' in line.upper():
-                    description = line.split(':', 1)[1].strip()
-                elif 'COLOR:' in line.upper():
-                    color_text = line.split(':', 1)[1].strip()
-                    if '#' in color_text:
-                        suggested_color = color_text.split('#')[1].split()[0]
-                        suggested_color = '#' + suggested_color[:6]
-                        # If brand colors exist, use closest match; otherwise use suggested
-                        if brand_colors:
-                            bg_color = brand_colors[0]  # Use primary brand color
-                        else:
-                            bg_color = suggested_color
-                elif 'STYLE:' in line.upper():
-                    style = line.split(':', 1)[1].strip().lower()
+            
+            color_text = ad_copy.color or ""
+            if '#' in color_text and not brand_colors:
+                # Brand colors always win; otherwise use the suggested hex
+                suggested_color = color_text.split('#')[1].split()[0]
+                bg_color = '#' + suggested_color[:6]
             
             # Create image
             image_id = str(uuid.uuid4())
-            image_path = os.path.join(settings.generated_ads_dir, f"{image_id}.png")
-            os.makedirs(settings.generated_ads_dir, exist_ok=True)
+            image_path = os.path.join(settings.generated_ads_dir, f"{image_id}.{_image_ext(request.image_format)}")
             
             logger.info(f"PIL Fallback - Using color: {bg_color}, Brand: {brand_name}, Brand colors: {brand_colors}")
             
             try:
-                img = Image.new('RGB', (1024, 1024), color=bg_color)
-            except:
+                img = _base_canvas(bg_color).copy()
+            except ValueError:
                 # If color parsing fails, use first brand color or default
                 fallback_color = brand_colors[0] if brand_colors else '#4A90E2'
-                img = Image.new('RGB', (1024, 1024), color=fallback_color)
+                img = _base_canvas(fallback_color).copy()
                 logger.warning(f"Color parsing failed for {bg_color}, using fallback: {fallback_color}")
             
-            draw = ImageDraw.Draw(img)
-            
             # Text colors based on brightness
-            try:
-                r = int(bg_color[1:3], 16)
-                g = int(bg_color[3:5], 16)
-                b = int(bg_color[5:7], 16)
-                brightness = (r * 299 + g * 587 + b * 114) / 1000
-                text_color = 'white' if brightness < 128 else 'black'
-                accent_color = '#FFD700' if brightness < 128 else '#FF6B00'
-            except:
-                text_color = 'white'
-                accent_color = '#FFD700'
-            
-            # Add fonts
-            try:
-                if style in ['bold', 'energetic']:
-                    font_headline = ImageFont.truetype("arial.ttf", 80)
-                    font_tagline = ImageFont.truetype("arial.ttf", 40)
-                    font_description = ImageFont.truetype("arial.ttf", 28)
-                elif style in ['minimalist', 'elegant']:
-                    font_headline = ImageFont.truetype("arial.ttf", 65)
-                    font_tagline = ImageFont.truetype("arial.ttf", 32)
-                    font_description = ImageFont.truetype("arial.ttf", 22)
-                else:
-                    font_headline = ImageFont.truetype("arial.ttf", 70)
-                    font_tagline = ImageFont.truetype("arial.ttf", 35)
-                    font_description = ImageFont.truetype("arial.ttf", 25)
-            except:
-                font_headline = ImageFont.load_default()
-                font_tagline = ImageFont.load_default()
-                font_description = ImageFont.load_default()
+            text_color, accent_color = _color_meta(bg_color)
+            
+            # Add fonts (parsed once per process, see _font)
+            if style in ['bold', 'energetic']:
+                font_headline = _font("arial.ttf", 80)
+                font_tagline = _font("arial.ttf", 40)
+                font_description = _font("arial.ttf", 28)
+            elif style in ['minimalist', 'elegant']:
+                font_headline = _font("arial.ttf", 65)
+                font_tagline = _font("arial.ttf", 32)
+                font_description = _font("arial.ttf", 22)
+            else:
+                font_headline = _font("arial.ttf", 70)
+                font_tagline = _font("arial.ttf", 35)
+                font_description = _font("arial.ttf", 25)
             
             # Positioning
             if style in ['minimalist', 'elegant']:
@@ -418,23 +646,23 @@ STYLE: [style]"""
             else:
                 y_headline, y_tagline, y_description = 300, 420, 520
             
-            # Draw text
-            headline_bbox = draw.textbbox((0, 0), headline.upper(), font=font_headline)
-            headline_width = headline_bbox[2] - headline_bbox[0]
-            draw.text(((1024 - headline_width) / 2, y_headline), headline.upper(), fill=text_color, font=font_headline)
+            # Draw text (centering only needs the advance width); each block is blended
+            # in from its own small layer so only the text regions are touched
+            headline_width = font_headline.getlength(headline.upper())
+            _blit_text(img, (1024 - headline_width) / 2, y_headline, headline.upper(), font_headline, text_color)
             
             if tagline:
-                tagline_bbox = draw.textbbox((0, 0), tagline, font=font_tagline)
-                tagline_width = tagline_bbox[2] - tagline_bbox[0]
-                draw.text(((1024 - tagline_width) / 2, y_tagline), tagline, fill=accent_color, font=font_tagline)
+                tagline_width = font_tagline.getlength(tagline)
+                _blit_text(img, (1024 - tagline_width) / 2, y_tagline, tagline, font_tagline, accent_color)
             
             if description:
                 wrapped_desc = textwrap.fill(description, width=40)
-                desc_bbox = draw.textbbox((0, 0), wrapped_desc, font=font_description)
-                desc_width = desc_bbox[2] - desc_bbox[0]
-                draw.text(((1024 - desc_width) / 2, y_description), wrapped_desc, fill=text_color, font=font_description)
+                desc_width = max(font_description.getlength(line) for line in wrapped_desc.splitlines())
+                _blit_text(img, (1024 - desc_width) / 2, y_description, wrapped_desc, font_description, text_color)
             
-            img.save(image_path)
+            # Flat-color ads gain little from heavy zlib; encode fast and write in one call, off the event loop
+            image_bytes = await self._run_io(_encode_image, img, request.image_format)
+            await self._run_io(pathlib.Path(image_path).write_bytes, image_bytes)
             
             logger.info(f"Generated fallback PIL image: {image_path}")
             
@@ -477,26 +705,18 @@ STYLE: [style]"""
         - Professional quality
         """
         try:
-            import vertexai
-            from vertexai.preview.vision_models import VideoGenerationModel
-            
-            # Initialize Vertex AI
-            vertexai.init(
-                project=settings.google_cloud_project,
-                location=settings.vertex_ai_location
-            )
-            
             logger.info(f"🎬 Generating video with Veo...")
             
             # Build video generation prompt with brand context
             video_prompt = self._build_video_prompt(prompt, request, brand_kit)
             
             # Load Veo model
-            model = VideoGenerationModel.from_pretrained("veo-001")
+            model = _get_video_model(settings.veo_model)
             
             # Generate video
             logger.info(f"Veo prompt: {video_prompt[:200]}...")
-            video_response = model.generate_videos(
+            video_response = await self._run_vertex(
+                model.generate_videos,
                 prompt=video_prompt,
                 number_of_videos=1,
                 aspect_ratio="16:9" if request.aspect_ratio == "16:9" else "9:16" if request.aspect_ratio == "9:16" else "1:1",
@@ -505,11 +725,10 @@ STYLE: [style]"""
             # Save video
             video_id = str(uuid.uuid4())
             video_path = os.path.join(settings.generated_ads_dir, f"{video_id}.mp4")
-            os.makedirs(settings.generated_ads_dir, exist_ok=True)
             
             # Get first video from response
             generated_video = video_response[0]
-            generated_video.save(location=video_path)
+            await self._run_vertex(generated_video.save, location=video_path)
             
             logger.info(f"✅ Video generated successfully: {video_path}")
             
@@ -591,9 +810,6 @@ Technical Specs:
         Fallback: Create simple video using PIL images + ffmpeg
         """
         try:
-            from PIL import Image, ImageDraw, ImageFont
-            import subprocess
-            
             logger.info("🎬 Using PIL+ffmpeg fallback for video generation")
             
             # Generate a static image first
@@ -610,22 +826,35 @@ Technical Specs:
             
             duration = request.duration if hasattr(request, 'duration') else 10
             
-            # ffmpeg command: create video from image with duration
+            # ffmpeg command: loop the still image for the duration. The frames are identical,
+            # so encode 2 fps, all keyframes (-g 1: no motion search), with the stillimage tune
+            # instead of a full 25 fps encode
             cmd = [
                 'ffmpeg',
                 '-loop', '1',
+                '-framerate', '1',
                 '-i', image_path,
                 '-c:v', 'libx264',
+                '-preset', 'ultrafast',
+                '-tune', 'stillimage',
                 '-t', str(duration),
                 '-pix_fmt', 'yuv420p',
-                '-vf', 'scale=1920:1080',
+                '-vf', 'scale=1920:1080:flags=neighbor',
+                '-r', '2',
+                '-g', '1',
                 '-y',
                 video_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Run ffmpeg without blocking the event loop
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            await proc.communicate()
             
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 logger.info(f"✅ Fallback video created: {video_path}")
                 return {
                     "success": True,
@@ -4,12 +4,26 @@ Color analysis and brand color matching
 
 import cv2
 import numpy as np
-from colorthief import ColorThief
-from PIL import Image
-import webcolors
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 from app.models.schemas import ColorAnalysis, BrandKit
+from app.utils.image_analysis import ImageAnalyzer
+
+
+def _harmony_sum(hues: np.ndarray) -> float:
+    """
+    Summed harmony contribution over every unordered pair of hues (degrees).
+    Plain NumPy: one broadcast difference plus three masks, no Python loop.
+    """
+    # Hue difference of every unordered pair
+    hue_diff = np.abs(hues[:, None] - hues[None, :])[np.triu_indices(len(hues), 1)]
+    
+    # Check for complementary, analogous, or triadic harmonies
+    complementary = (hue_diff >= 160) & (hue_diff <= 200)  # Opposite on color wheel
+    analogous = hue_diff <= 30  # Adjacent on color wheel
+    triadic = ((hue_diff >= 110) & (hue_diff <= 130)) | ((hue_diff >= 230) & (hue_diff <= 250))  # 120 degrees apart
+    
+    return float(0.3 * complementary.sum() + 0.2 * analogous.sum() + 0.25 * triadic.sum())
 
 
 class ColorMatcher:
@@ -17,24 +31,25 @@ class ColorMatcher:
     
     def analyze_colors(
         self,
-        image_path: str,
+        image: Union[str, np.ndarray],
         brand_kit: Optional[BrandKit] = None
     ) -> ColorAnalysis:
         """
         Extract and analyze colors from image
         
         Args:
-            image_path: Path to image
+            image: Path to image, or an already-decoded BGR image
             brand_kit: Brand guidelines with color palette
             
         Returns:
             ColorAnalysis with color metrics
         """
-        # Extract dominant colors
-        dominant_colors = self._extract_dominant_colors(image_path, count=5)
+        img = ImageAnalyzer.load_image(image)
         
-        # Get full color palette
-        color_palette = self._extract_color_palette(image_path)
+        # Dominant colors and full palette from one clustering pass
+        dominant_colors, color_palette = self._extract_dominant_and_palette(
+            img, dominant_n=5, palette_n=6
+        )
         
         # Calculate brand color match if brand kit provided
         brand_color_match = 0.0
@@ -53,46 +68,43 @@ class ColorMatcher:
             color_harmony=color_harmony
         )
     
-    def _extract_dominant_colors(
+    def _extract_dominant_and_palette(
         self,
-        image_path: str,
-        count: int = 5
-    ) -> List[Tuple[int, int, int]]:
-        """Extract dominant colors using k-means clustering"""
-        # Load image
-        img = cv2.imread(image_path)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        
-        # Reshape image to list of pixels
-        pixels = img.reshape(-1, 3)
-        pixels = np.float32(pixels)
-        
-        # K-means clustering
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
+        img: np.ndarray,
+        dominant_n: int = 5,
+        palette_n: int = 6
+    ) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+        """
+        Extract dominant colors and the color palette with a single k-means run
+        
+        Returns:
+            (top dominant_n colors, all palette_n colors), both ordered by frequency
+        """
+        count = max(dominant_n, palette_n)
+        
+        # Dominant colors don't depend on resolution; cluster a 256x256 thumbnail
+        img = cv2.resize(img, (256, 256), interpolation=cv2.INTER_AREA)
+        
+        # Reshape image to list of pixels (k-means ignores channel order, so stay in BGR)
+        pixels = np.ascontiguousarray(img.reshape(-1, 3), dtype=np.float32)
+        
+        # K-means clustering: k-means++ seeding converges well in a single attempt;
+        # 1.0 EPS (in 0-255 color units) is far below what changes a hex color
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 15, 1.0)
         _, labels, centers = cv2.kmeans(
-            pixels, count, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS
+            pixels, count, None, criteria, 1, cv2.KMEANS_PP_CENTERS
         )
         
-        # Convert to integers
-        centers = np.uint8(centers)
+        # Convert to integers, BGR -> RGB
+        centers = np.uint8(centers)[:, ::-1]
         
         # Sort by frequency
-        label_counts = np.bincount(labels.flatten())
+        label_counts = np.bincount(labels.flatten(), minlength=count)
         sorted_indices = np.argsort(label_counts)[::-1]
         
-        dominant_colors = [tuple(centers[i]) for i in sorted_indices]
+        colors = [tuple(centers[i]) for i in sorted_indices]
         
-        return dominant_colors
-    
-    def _extract_color_palette(self, image_path: str) -> List[Tuple[int, int, int]]:
-        """Extract color palette using ColorThief"""
-        try:
-            color_thief = ColorThief(image_path)
-            palette = color_thief.get_palette(color_count=6, quality=1)
-            return palette
-        except Exception as e:
-            print(f"Error extracting palette: {e}")
-            return []
+        return colors[:dominant_n], colors[:palette_n]
     
     def _calculate_brand_match(
         self,
@@ -107,22 +119,24 @@ class ColorMatcher:
         if not brand_colors:
             return 0.0
         
-        # Convert brand colors to RGB
-        brand_rgb = [self._hex_to_rgb(c) for c in brand_colors]
-        
-        # For each brand color, find closest match in image
-        matches = []
-        for brand_color in brand_rgb:
-            closest_distance = min(
-                self._color_distance(brand_color, img_color)
-                for img_color in image_colors
-            )
-            # Normalize distance (max distance is ~441 for RGB)
-            similarity = 1 - (closest_distance / 441.0)
-            matches.append(similarity)
+        if not image_colors:
+            return 0.0
         
-        # Return average similarity
-        return round(sum(matches) / len(matches), 3)
+        # Convert brand + image colors to CIELab in one call; Lab distance is
+        # roughly perceptual, unlike RGB distance
+        rgb = [self._hex_to_rgb(c) for c in brand_colors] + [tuple(c) for c in image_colors]
+        rgb = np.asarray(rgb, dtype=np.float32).reshape(-1, 1, 3) / 255.0
+        lab = cv2.cvtColor(rgb, cv2.COLOR_RGB2LAB).reshape(-1, 3)
+        brand, img = lab[:len(brand_colors)], lab[len(brand_colors):]
+        
+        # For each brand color, distance to the closest image color (M x N matrix, min over N).
+        # Squared distance preserves the min, so only the M minima need a sqrt
+        diff = brand[:, None, :] - img[None, :, :]
+        closest_distance = np.sqrt((diff * diff).sum(-1).min(axis=1))
+        
+        # Normalize distance (~100*sqrt(3) spans the practical Lab range) and return average similarity
+        similarity = np.clip(1 - closest_distance / 173.0, 0.0, 1.0)
+        return round(float(similarity.mean()), 3)
     
     def _calculate_color_harmony(
         self,
@@ -135,27 +149,11 @@ class ColorMatcher:
         if len(colors) < 2:
             return 1.0
         
-        # Convert to HSV for better harmony analysis
-        hsv_colors = [self._rgb_to_hsv(c) for c in colors]
-        
-        # Check for complementary, analogous, or triadic harmonies
-        harmony_score = 0.0
-        
-        for i in range(len(hsv_colors)):
-            for j in range(i + 1, len(hsv_colors)):
-                hue_diff = abs(hsv_colors[i][0] - hsv_colors[j][0])
-                
-                # Complementary (opposite on color wheel)
-                if 160 <= hue_diff <= 200:
-                    harmony_score += 0.3
-                
-                # Analogous (adjacent on color wheel)
-                elif hue_diff <= 30:
-                    harmony_score += 0.2
-                
-                # Triadic (120 degrees apart)
-                elif 110 <= hue_diff <= 130 or 230 <= hue_diff <= 250:
-                    harmony_score += 0.25
+        # Convert to HSV for better harmony analysis (float input gives hue in degrees)
+        rgb = np.asarray(colors, dtype=np.float32).reshape(1, -1, 3) / 255.0
+        hues = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)[0, :, 0]
+        
+        harmony_score = _harmony_sum(hues)
         
         # Normalize
         max_pairs = len(colors) * (len(colors) - 1) / 2
@@ -173,34 +171,3 @@ class ColorMatcher:
         """Convert hex string to RGB tuple"""
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    
-    @staticmethod
-    def _rgb_to_hsv(rgb: Tuple[int, int, int]) -> Tuple[float, float, float]:
-        """Convert RGB to HSV"""
-        r, g, b = [x / 255.0 for x in rgb]
-        max_val = max(r, g, b)
-        min_val = min(r, g, b)
-        diff = max_val - min_val
-        
-        # Hue
-        if diff == 0:
-            h = 0
-        elif max_val == r:
-            h = (60 * ((g - b) / diff) + 360) % 360
-        elif max_val == g:
-            h = (60 * ((b - r) / diff) + 120) % 360
-        else:
-            h = (60 * ((r - g) / diff) + 240) % 360
-        
-        # Saturation
-        s = 0 if max_val == 0 else (diff / max_val)
-        
-        # Value
-        v = max_val
-        
-        return (h, s, v)
-    
-    @staticmethod
-    def _color_distance(color1: Tuple[int, int, int], color2: Tuple[int, int, int]) -> float:
-        """Calculate Euclidean distance between two RGB colors"""
-        return np.sqrt(sum((c1 - c2) ** 2 for c1, c2 in zip(color1, color2)))
@@ -0,0 +1,31 @@
+"""
+Directory listing cache gated on the directory's mtime
+"""
+
+import functools
+import os
+from typing import Tuple, Union
+
+
+@functools.lru_cache(maxsize=16)
+def _scan(path: str, mtime_ns: int) -> Tuple[Tuple[str, int], ...]:
+    """(name, size) of every file in a directory; mtime_ns is only part of the cache key"""
+    with os.scandir(path) as it:
+        return tuple((e.name, e.stat().st_size) for e in it if e.is_file())
+
+
+def cached_scandir(path: Union[str, os.PathLike]) -> Tuple[Tuple[str, int], ...]:
+    """
+    List a directory, rescanning only when its mtime changes.
+
+    Creating, deleting or renaming entries bumps the directory mtime, so a repeat
+    call on an unchanged directory costs a single stat. In-place rewrites of an
+    existing file are not detected (generated files are written once under new names).
+    """
+    path = os.fspath(path)
+    return _scan(path, os.stat(path).st_mtime_ns)
+
+
+def invalidate() -> None:
+    """Drop every cached listing"""
+    _scan.cache_clear()
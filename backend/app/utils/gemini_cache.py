@@ -0,0 +1,185 @@
+"""
+Gemini explicit context caching and Files API helpers
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.generativeai import caching
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiContextCache:
+    """
+    Keeps one Gemini model per key (e.g. per brand) whose static prompt prefix
+    lives in an explicit CachedContent, so each call only sends the dynamic tail.
+
+    Prefixes below the API's minimum cacheable size fall back to a plain model
+    with the prefix as system instruction (static first, dynamic last).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cached_model_name: str,
+        min_tokens: int = 4096,
+        ttl: datetime.timedelta = datetime.timedelta(minutes=10)
+    ):
+        """
+        Args:
+            model_name: Model used for the uncached path
+            cached_model_name: Versioned model name required by the caching API
+            min_tokens: Minimum prefix size the caching API accepts
+            ttl: Lifetime of each CachedContent
+        """
+        self.model_name = model_name
+        self.cached_model_name = cached_model_name
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        self._models: Dict[str, Tuple[datetime.datetime, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_model_async(
+        self,
+        key: str,
+        system_instruction: str,
+        contents: Optional[List[Any]] = None
+    ):
+        """
+        get_model for async callers: a live model is returned directly, otherwise the
+        blocking CachedContent.create runs in a worker thread. Concurrent misses for
+        the same key wait on one creation instead of each paying for a cache.
+        """
+        model = self._live_model(key)
+        if model is not None:
+            return model
+        async with self._locks[key]:
+            model = self._live_model(key)
+            if model is None:
+                model = await asyncio.to_thread(self.get_model, key, system_instruction, contents)
+        return model
+
+    def _live_model(self, key: str):
+        """Model for key if its cache has not expired, else None"""
+        entry = self._models.get(key)
+        if entry and entry[0] > datetime.datetime.now(datetime.timezone.utc):
+            return entry[1]
+        return None
+
+    def get_model(
+        self,
+        key: str,
+        system_instruction: str,
+        contents: Optional[List[Any]] = None
+    ):
+        """Return a model for this static prefix, creating the cache on first use"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        entry = self._models.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+
+        if self._estimate_tokens(system_instruction, contents) >= self.min_tokens:
+            try:
+                cache = caching.CachedContent.create(
+                    model=self.cached_model_name,
+                    display_name=key[:128],
+                    system_instruction=system_instruction,
+                    contents=contents,
+                    ttl=self.ttl
+                )
+                model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+                logger.info(f"Created Gemini context cache for '{key}'")
+            except Exception as e:
+                logger.warning(f"Context caching unavailable for '{key}', using uncached prompt: {e}")
+
+        # Refresh slightly before the server-side cache expires
+        self._models[key] = (now + self.ttl - datetime.timedelta(seconds=30), model)
+        return model
+
+    def invalidate(self, key: str) -> None:
+        """Drop the model for a key (e.g. when its brand kit changes)"""
+        self._models.pop(key, None)
+
+    @staticmethod
+    def _estimate_tokens(system_instruction: str, contents: Optional[List[Any]]) -> int:
+        """Rough token estimate (~4 characters per token) to avoid a count_tokens round trip"""
+        text_len = len(system_instruction)
+        for part in contents or []:
+            if isinstance(part, str):
+                text_len += len(part)
+        return text_len // 4
+
+
+class GeminiFileRegistry:
+    """
+    Uploads local reference files (e.g. brand logos) to the Gemini Files API once
+    and hands out the file handle, so repeat requests reference the stored file
+    instead of re-sending its bytes.
+
+    Uploads are keyed by (path, mtime), so a file is uploaded again only when it
+    changes or the stored copy nears the API's retention limit.
+    """
+
+    def __init__(self, ttl: datetime.timedelta = datetime.timedelta(hours=47)):
+        """
+        Args:
+            ttl: How long to reuse an upload (the Files API keeps files for 48h)
+        """
+        self.ttl = ttl
+        self._files: Dict[Tuple[str, int], Tuple[datetime.datetime, Any]] = {}
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_file_async(self, path: str) -> Optional[Any]:
+        """
+        Return the uploaded handle for a local file, or None if it can't be uploaded.
+        A live upload is returned directly; otherwise the blocking upload runs in a
+        worker thread, once for concurrent callers.
+        """
+        key = self._key(path)
+        if key is None:
+            return None
+        uploaded = self._live_file(key)
+        if uploaded is not None:
+            return uploaded
+        async with self._locks[key]:
+            uploaded = self._live_file(key)
+            if uploaded is None:
+                uploaded = await asyncio.to_thread(self._upload, key)
+        return uploaded
+
+    @staticmethod
+    def _key(path: str) -> Optional[Tuple[str, int]]:
+        """(path, mtime_ns) of a local file, or None if it isn't one"""
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _live_file(self, key: Tuple[str, int]) -> Optional[Any]:
+        entry = self._files.get(key)
+        if entry and entry[0] > datetime.datetime.now(datetime.timezone.utc):
+            return entry[1]
+        return None
+
+    def _upload(self, key: Tuple[str, int]) -> Optional[Any]:
+        path = key[0]
+        try:
+            uploaded = genai.upload_file(path, display_name=os.path.basename(path)[:128])
+            logger.info(f"Uploaded '{path}' to the Gemini Files API as {uploaded.name}")
+        except Exception as e:
+            logger.warning(f"File upload unavailable for '{path}': {e}")
+            return None
+
+        # Older versions of the file are superseded
+        for stale in [k for k in self._files if k[0] == path]:
+            del self._files[stale]
+        self._files[key] = (datetime.datetime.now(datetime.timezone.utc) + self.ttl, uploaded)
+        return uploaded
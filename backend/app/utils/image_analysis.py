@@ -5,44 +5,71 @@ Image quality analysis using OpenCV
 import cv2
 import numpy as np
 from PIL import Image
-from typing import Tuple
+from typing import Tuple, Union
 
 from app.models.schemas import VisualAnalysis
 
+# Longest side the quality metrics are computed at
+_MAX_ANALYSIS_DIM = 1024
+
+# Laplacian-variance normalizer for sharpness (empirical: 100 is decent, 500+ is sharp at full resolution)
+_SHARPNESS_NORM = 500.0
+# Filtered-variance threshold above which an image counts as noisy / artifacted
+_ARTIFACT_THRESHOLD = 1000.0
+
 
 class ImageAnalyzer:
     """Analyzes image quality using computer vision techniques"""
     
-    def analyze_quality(self, image_path: str) -> VisualAnalysis:
+    @staticmethod
+    def load_image(image: Union[str, np.ndarray]) -> np.ndarray:
+        """Return a BGR ndarray, decoding from disk only when given a path"""
+        if isinstance(image, np.ndarray):
+            return image
+        img = cv2.imread(image)
+        if img is None:
+            raise ValueError(f"Could not load image: {image}")
+        return img
+    
+    def analyze_quality(self, image: Union[str, np.ndarray]) -> VisualAnalysis:
         """
         Analyze image quality metrics
         
         Args:
-            image_path: Path to image file
+            image: Path to image file, or an already-decoded BGR image
             
         Returns:
             VisualAnalysis with quality metrics
         """
         # Load image
-        img = cv2.imread(image_path)
-        if img is None:
-            raise ValueError(f"Could not load image: {image_path}")
+        img = self.load_image(image)
         
         # Get resolution
         height, width = img.shape[:2]
         aspect_ratio = f"{width}:{height}"
         
+        # Work on a copy capped at 1024px; generated ads are already 1024x1024,
+        # larger uploads would otherwise scan hundreds of MB per filter
+        longest = max(height, width)
+        scale = 1.0
+        if longest > _MAX_ANALYSIS_DIM:
+            scale = _MAX_ANALYSIS_DIM / longest
+            img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        # Grayscale once; sharpness, composition and artifact checks all read it
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        
         # Analyze sharpness
-        sharpness = self._calculate_sharpness(img)
+        sharpness = self._calculate_sharpness(gray, scale)
         
         # Analyze composition
-        composition = self._analyze_composition(img)
+        composition = self._analyze_composition(gray)
         
         # Check for watermarks (simple detection)
         has_watermark = self._detect_watermark(img)
         
         # Check for compression artifacts
-        has_artifacts = self._detect_artifacts(img)
+        has_artifacts = self._detect_artifacts(gray, scale)
         
         return VisualAnalysis(
             sharpness=sharpness,
@@ -53,41 +80,33 @@ class ImageAnalyzer:
             aspect_ratio=aspect_ratio
         )
     
-    def _calculate_sharpness(self, img: np.ndarray) -> float:
+    def _calculate_sharpness(self, gray: np.ndarray, scale: float = 1.0) -> float:
         """
         Calculate image sharpness using Laplacian variance
         Higher values indicate sharper images
+        
+        scale is the downscale factor applied to gray. Shrinking concentrates edges
+        into fewer pixels and raises the variance by roughly 1/scale^2, so the
+        normalizer is rescaled to keep scores comparable with full resolution.
         """
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        laplacian = cv2.Laplacian(gray, cv2.CV_32F)
+        laplacian_var = laplacian.var(dtype=np.float64)
         
-        # Normalize to 0-1 scale (empirical threshold: 100 is decent, 500+ is sharp)
-        sharpness_score = min(laplacian_var / 500.0, 1.0)
+        # Normalize to 0-1 scale
+        sharpness_score = min(laplacian_var / (_SHARPNESS_NORM / scale ** 2), 1.0)
         
-        return round(sharpness_score, 3)
+        return round(float(sharpness_score), 3)
     
-    def _analyze_composition(self, img: np.ndarray) -> float:
+    def _analyze_composition(self, gray: np.ndarray) -> float:
         """
         Analyze composition quality using rule of thirds and balance
         """
-        height, width = img.shape[:2]
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Divide image into 9 sections (rule of thirds)
-        h_third = height // 3
-        w_third = width // 3
-        
-        sections = []
-        for i in range(3):
-            for j in range(3):
-                section = gray[i*h_third:(i+1)*h_third, j*w_third:(j+1)*w_third]
-                sections.append(section.mean())
+        # Mean intensity of the 9 rule-of-thirds sections in one area-averaging pass
+        sections = cv2.resize(gray, (3, 3), interpolation=cv2.INTER_AREA).astype(np.float64)
         
         # Good composition has varied intensity across sections
         # but not too extreme
-        std_dev = np.std(sections)
+        std_dev = sections.std()
         composition_score = min(std_dev / 50.0, 1.0)  # Normalize
         
         # Also check if image is not too dark or too bright
@@ -98,7 +117,7 @@ class ImageAnalyzer:
         
         final_score = max(0, composition_score - brightness_penalty)
         
-        return round(final_score, 3)
+        return round(float(final_score), 3)
     
     def _detect_watermark(self, img: np.ndarray) -> bool:
         """
@@ -109,32 +128,30 @@ class ImageAnalyzer:
         
         # Check corners for potential watermarks
         corner_size = min(height, width) // 8
-        corners = [
-            img[0:corner_size, 0:corner_size],  # Top-left
-            img[0:corner_size, -corner_size:],  # Top-right
-            img[-corner_size:, 0:corner_size],  # Bottom-left
-            img[-corner_size:, -corner_size:]   # Bottom-right
-        ]
+        if corner_size == 0:
+            return False
+        c = corner_size
+        corners = np.stack([
+            img[0:c, 0:c],  # Top-left
+            img[0:c, -c:],  # Top-right
+            img[-c:, 0:c],  # Bottom-left
+            img[-c:, -c:]   # Bottom-right
+        ])
         
         # Simple heuristic: check if corners have significantly different
         # characteristics than the center (potential watermark)
         center = img[height//3:2*height//3, width//3:2*width//3]
         center_std = np.std(center)
         
-        for corner in corners:
-            corner_std = np.std(corner)
-            # If corner is much more uniform than center, might be watermark
-            if corner_std < center_std * 0.5 and corner_std > 5:
-                return True
-        
-        return False
+        # If a corner is much more uniform than center, might be watermark
+        corner_stds = corners.reshape(4, -1).std(axis=1)
+        return bool(((corner_stds < center_std * 0.5) & (corner_stds > 5)).any())
     
-    def _detect_artifacts(self, img: np.ndarray) -> bool:
+    def _detect_artifacts(self, gray: np.ndarray, scale: float = 1.0) -> bool:
         """
         Detect compression artifacts or noise
+        (threshold rescaled for downscaled input, like the sharpness normalizer)
         """
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
         # Apply high-pass filter to detect noise/artifacts
         kernel = np.array([[-1, -1, -1],
                           [-1,  8, -1],
@@ -142,29 +159,36 @@ class ImageAnalyzer:
         filtered = cv2.filter2D(gray, -1, kernel)
         
         # High variance in filtered image indicates artifacts
-        artifact_level = filtered.var()
+        artifact_level = filtered.var(dtype=np.float64)
         
         # Threshold for artifact detection (empirical)
-        return artifact_level > 1000
+        return bool(artifact_level > _ARTIFACT_THRESHOLD / scale ** 2)
     
-    def extract_text_regions(self, image_path: str) -> list:
+    def extract_text_regions(self, image: Union[str, np.ndarray]) -> list:
         """
         Extract regions that likely contain text
         Useful for checking message clarity
         """
-        img = cv2.imread(image_path)
+        img = self.load_image(image)
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape
+        
+        # MSER cost grows with pixel count; detect on a copy capped at 1024px
+        scale = min(1.0, 1024 / max(height, width))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
         # Use MSER (Maximally Stable Extremal Regions) for text detection
         mser = cv2.MSER_create()
-        regions, _ = mser.detectRegions(gray)
+        _, bboxes = mser.detectRegions(gray)
+        if len(bboxes) == 0:
+            return []
+        
+        # Bounding boxes back in original-image pixels
+        boxes = np.round(np.asarray(bboxes, dtype=np.float64) / scale).astype(int)
+        w, h = boxes[:, 2], boxes[:, 3]
         
-        # Filter and return bounding boxes
-        text_boxes = []
-        for region in regions:
-            x, y, w, h = cv2.boundingRect(region)
-            # Filter out very small or very large regions
-            if 10 < w < img.shape[1] * 0.8 and 10 < h < img.shape[0] * 0.3:
-                text_boxes.append((x, y, w, h))
+        # Filter out very small or very large regions
+        mask = (w > 10) & (w < width * 0.8) & (h > 10) & (h < height * 0.3)
         
-        return text_boxes
+        return [tuple(box) for box in boxes[mask].tolist()]
@@ -0,0 +1,182 @@
+"""
+Shared FastAPI application builder
+"""
+
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, ORJSONResponse
+from pathlib import Path
+import asyncio
+import cv2
+import os
+import sys
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config import settings
+from app.api import critique, generate, brand_kit, upload
+from app.utils.fs_cache import cached_scandir
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_PATH = Path(__file__).parent.parent / "frontend" / "index.html"
+
+# Extensions a generated ad can be saved with (see GenerateAdRequest.image_format)
+_AD_MEDIA_TYPES = {"png": "image/png", "jpg": "image/jpeg"}
+
+
+def _list_generated_ads() -> list:
+    """Name and size of every generated ad file (rescanned only when the folder changes)"""
+    try:
+        entries = cached_scandir(settings.generated_ads_dir)
+    except FileNotFoundError:
+        return []
+    return [{"name": name, "size": size} for name, size in entries if "." in name]
+
+
+def create_app(include_multi_agent: bool = False, include_approval: bool = False) -> FastAPI:
+    """
+    Build the BrandAI app with its middleware, routers and static mounts.
+
+    Filesystem setup runs in a startup hook, so importing an app (e.g. during
+    pytest collection) does not create directories.
+
+    Args:
+        include_multi_agent: Mount the multi-agent workflow router
+        include_approval: Mount the human approval router
+
+    Returns:
+        Configured FastAPI application
+    """
+    app = FastAPI(
+        title="BrandAI - AI Ad Critique System",
+        description="Automated critique and improvement of AI-generated advertisements",
+        version="1.0.0",
+        default_response_class=ORJSONResponse  # orjson: C-level serialization of the nested critique dicts
+    )
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Compress verbose critique / workflow JSON responses
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+    # Include routers
+    app.include_router(critique.router, prefix="/api", tags=["Critique"])
+    app.include_router(generate.router, prefix="/api", tags=["Generate"])
+    app.include_router(brand_kit.router, prefix="/api", tags=["Brand Kit"])
+    if include_multi_agent:
+        from app.api import multi_agent
+        app.include_router(multi_agent.router, prefix="/api/multi-agent", tags=["Multi-Agent Workflow"])
+    if include_approval:
+        from app.api import approval
+        app.include_router(approval.router, prefix="/api/approval", tags=["Human Approval"])
+    app.include_router(upload.router, prefix="/api/upload", tags=["File Upload"])
+
+    # Mount static files for generated ads using absolute paths
+    # (directories may not exist until the startup hook runs)
+    generated_ads_path = os.path.join(BASE_DIR, "generated_ads")
+    uploads_path = os.path.join(BASE_DIR, "uploads")
+    app.mount("/generated_ads", StaticFiles(directory=generated_ads_path, check_dir=False), name="generated_ads")
+    app.mount("/uploads", StaticFiles(directory=uploads_path, check_dir=False), name="uploads")
+
+    @app.on_event("startup")
+    async def startup():
+        """Create working directories and tune OpenCV"""
+        os.makedirs(settings.upload_dir, exist_ok=True)
+        os.makedirs(settings.brand_kit_dir, exist_ok=True)
+        os.makedirs(settings.generated_ads_dir, exist_ok=True)
+        os.makedirs("backend/uploads/brand_logos", exist_ok=True)
+        os.makedirs("backend/uploads/product_images", exist_ok=True)
+        os.makedirs(generated_ads_path, exist_ok=True)
+        os.makedirs(uploads_path, exist_ok=True)
+
+        # Let OpenCV's parallel backend use the spare cores for resize/Laplacian/kmeans
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(max(1, (os.cpu_count() or 1) - 1))
+
+        print(f"📁 Mounting static files:")
+        print(f"   /generated_ads → {generated_ads_path}")
+        print(f"   /uploads → {uploads_path}")
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        """Release the generation thread pools"""
+        generate.generation_service.close()
+
+    @app.get("/")
+    async def root():
+        """Redirect to frontend"""
+        return FileResponse(FRONTEND_PATH)
+
+    @app.get("/app")
+    async def serve_frontend():
+        """Root endpoint serves the frontend"""
+        return FileResponse(FRONTEND_PATH)
+
+    @app.get("/api")
+    async def api_root():
+        """API root endpoint with API information"""
+        return {
+            "name": "BrandAI API",
+            "version": "1.0.0",
+            "description": "AI-powered ad critique and improvement system with multi-agent workflow",
+            "endpoints": {
+                "critique": "/api/critique-ad",
+                "generate": "/api/generate-ad",
+                "improve": "/api/improve-ad",
+                "multi_agent": "/api/multi-agent/generate-and-refine",
+                "workflow_info": "/api/multi-agent/workflow-status",
+                "brand_kit": "/api/brand-kit",
+                "docs": "/docs"
+            },
+            "features": [
+                "AI-powered ad critique",
+                "Multi-agent refinement workflow",
+                "Brand alignment scoring",
+                "Automatic iterative improvement"
+            ]
+        }
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy", "service": "BrandAI"}
+
+    @app.get("/api/_debug/status")
+    async def debug_status():
+        """Health, brand kits and generated ads in one response (for smoke tests)"""
+        brand_kits, generated_ads = await asyncio.gather(
+            brand_kit.brand_service.list_brand_kits(),
+            asyncio.to_thread(_list_generated_ads)
+        )
+        return {
+            "health": await health_check(),
+            "brand_kits": brand_kits,
+            "generated_ads": generated_ads
+        }
+
+    @app.get("/api/download-ad/{ad_id}")
+    async def download_ad(ad_id: str):
+        """Download a generated ad image (PNG or JPEG)"""
+        for ext, media_type in _AD_MEDIA_TYPES.items():
+            ad_path = os.path.join(settings.generated_ads_dir, f"{ad_id}.{ext}")
+            if os.path.exists(ad_path):
+                return FileResponse(
+                    ad_path,
+                    media_type=media_type,
+                    filename=f"brandai_ad_{ad_id}.{ext}",
+                    headers={"Content-Disposition": f"attachment; filename=brandai_ad_{ad_id}.{ext}"}
+                )
+
+        raise HTTPException(status_code=404, detail="Ad image not found")
+
+    return app
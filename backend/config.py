@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     # Application
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    app_workers: int = 1  # uvicorn worker processes (ignored while reload/debug is on; >1 disables /api/multi-agent/jobs)
+    app_backlog: int = 2048  # listen() backlog for bursts of concurrent connections
     debug: bool = True
     
     # Upload Settings
@@ -34,6 +36,10 @@ class Settings(BaseSettings):
     imagen_model: str = "imagegeneration@006"
     veo_model: str = "veo-001"
     
+    # Generation Concurrency
+    max_concurrent_generations: int = 3
+    vertex_concurrency: int = 8  # Threads for blocking Imagen/Veo SDK calls
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,121 +1,9 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
-from pathlib import Path
 import uvicorn
-import os
-import sys
-
-# Add backend directory to path
-sys.path.insert(0, os.path.dirname(__file__))
 
+from app_factory import create_app
 from config import settings
-from app.api import critique, generate, brand_kit, multi_agent, approval, upload
-
-# Create necessary directories
-os.makedirs(settings.upload_dir, exist_ok=True)
-os.makedirs(settings.brand_kit_dir, exist_ok=True)
-os.makedirs(settings.generated_ads_dir, exist_ok=True)
-os.makedirs("backend/uploads/brand_logos", exist_ok=True)
-os.makedirs("backend/uploads/product_images", exist_ok=True)
-
-app = FastAPI(
-    title="BrandAI - AI Ad Critique System",
-    description="Automated critique and improvement of AI-generated advertisements",
-    version="1.0.0"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(critique.router, prefix="/api", tags=["Critique"])
-app.include_router(generate.router, prefix="/api", tags=["Generate"])
-app.include_router(brand_kit.router, prefix="/api", tags=["Brand Kit"])
-app.include_router(multi_agent.router, prefix="/api/multi-agent", tags=["Multi-Agent Workflow"])
-app.include_router(approval.router, prefix="/api/approval", tags=["Human Approval"])
-app.include_router(upload.router, prefix="/api/upload", tags=["File Upload"])
-
-# Mount static files for generated ads using absolute paths
-import os
-base_dir = os.path.dirname(os.path.abspath(__file__))
-generated_ads_path = os.path.join(base_dir, "generated_ads")
-uploads_path = os.path.join(base_dir, "uploads")
-
-print(f"📁 Mounting static files:")
-print(f"   /generated_ads → {generated_ads_path}")
-print(f"   /uploads → {uploads_path}")
-
-app.mount("/generated_ads", StaticFiles(directory=generated_ads_path), name="generated_ads")
-app.mount("/uploads", StaticFiles(directory=uploads_path), name="uploads")
-
-
-@app.get("/")
-async def root():
-    """Redirect to frontend"""
-    frontend_path = Path(__file__).parent.parent / "frontend" / "index.html"
-    return FileResponse(frontend_path)
 
-
-@app.get("/app")
-async def serve_frontend():
-    """Root endpoint serves the frontend"""
-    frontend_path = Path(__file__).parent.parent / "frontend" / "index.html"
-    return FileResponse(frontend_path)
-
-
-@app.get("/api")
-async def api_root():
-    """API root endpoint with API information"""
-    return {
-        "name": "BrandAI API",
-        "version": "1.0.0",
-        "description": "AI-powered ad critique and improvement system with multi-agent workflow",
-        "endpoints": {
-            "critique": "/api/critique-ad",
-            "generate": "/api/generate-ad",
-            "improve": "/api/improve-ad",
-            "multi_agent": "/api/multi-agent/generate-and-refine",
-            "workflow_info": "/api/multi-agent/workflow-status",
-            "brand_kit": "/api/brand-kit",
-            "docs": "/docs"
-        },
-        "features": [
-            "AI-powered ad critique",
-            "Multi-agent refinement workflow",
-            "Brand alignment scoring",
-            "Automatic iterative improvement"
-        ]
-    }
-
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "BrandAI"}
-
-
-@app.get("/api/download-ad/{ad_id}")
-async def download_ad(ad_id: str):
-    """Download a generated ad image"""
-    ad_path = os.path.join(settings.generated_ads_dir, f"{ad_id}.png")
-    
-    if not os.path.exists(ad_path):
-        raise HTTPException(status_code=404, detail="Ad image not found")
-    
-    return FileResponse(
-        ad_path,
-        media_type="image/png",
-        filename=f"brandai_ad_{ad_id}.png",
-        headers={"Content-Disposition": f"attachment; filename=brandai_ad_{ad_id}.png"}
-    )
+app = create_app(include_multi_agent=True, include_approval=True)
 
 
 if __name__ == "__main__":
@@ -136,5 +24,9 @@ if __name__ == "__main__":
         "main:app",
         host=settings.app_host,
         port=settings.app_port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=settings.app_workers,
+        backlog=settings.app_backlog,
+        loop="auto",  # uvloop when installed (not available on Windows)
+        http="httptools"
     )
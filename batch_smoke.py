@@ -0,0 +1,76 @@
+"""
+Manual Gemini Batch Mode smoke check (not part of the pytest suite)
+
+Submits one generation prompt as a Batch Mode job (discounted, higher rate
+limits) and polls until it finishes or the deadline passes. This talks to the
+Gemini API directly and never touches the BrandAI backend.
+
+Usage:
+    GEMINI_API_KEY=... python batch_smoke.py [--timeout SECONDS] [prompt]
+
+GEMINI_BATCH_MODEL picks the model (default: gemini-2.5-flash).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+DEFAULT_PROMPT = "Create a simple ad for running shoes"
+DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+
+def run_batch_smoke(prompt, timeout=3600, poll_interval=30):
+    """
+    Submit the prompt as a Gemini Batch Mode job and wait up to timeout seconds.
+    Batch jobs may stay pending for up to 24h, so the job is cancelled at the deadline.
+    """
+    from google import genai
+
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    model = os.getenv("GEMINI_BATCH_MODEL", "gemini-2.5-flash")
+
+    line = {"key": "smoke", "request": {"contents": [{"parts": [{"text": prompt}]}]}}
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write(json.dumps(line) + "\n")
+        src_path = f.name
+
+    try:
+        src = client.files.upload(
+            file=src_path,
+            config={"display_name": "smoke", "mime_type": "jsonl"}
+        )
+    finally:
+        os.remove(src_path)
+
+    job = client.batches.create(model=model, src=src.name, config={"display_name": "smoke"})
+    print(f"Submitted batch job {job.name} ({model}), waiting up to {timeout}s")
+
+    deadline = time.monotonic() + timeout
+    while job.state.name not in DONE_STATES:
+        if time.monotonic() >= deadline:
+            print(f"❌ Batch job still {job.state.name} after {timeout}s, cancelling")
+            client.batches.cancel(name=job.name)
+            return False
+        time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+        job = client.batches.get(name=job.name)
+        print(f"   {job.state.name}")
+
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        print(f"❌ Batch job ended in {job.state.name}")
+        return False
+
+    results = client.files.download(file=job.dest.file_name).decode("utf-8")
+    for row in results.splitlines():
+        print(f"Result: {json.dumps(json.loads(row), indent=2)}")
+    print("✅ Batch generation works!")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("prompt", nargs="?", default=DEFAULT_PROMPT)
+    parser.add_argument("--timeout", type=int, default=3600, help="seconds to wait before cancelling the job")
+    args = parser.parse_args()
+    sys.exit(0 if run_batch_smoke(args.prompt, timeout=args.timeout) else 1)
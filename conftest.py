@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the BrandAI smoke tests
+
+Run the whole suite in parallel worker processes with:
+    pytest -n auto
+(asyncio_mode = auto is set in pytest.ini, so async tests need no marker)
+"""
+import os
+import socket
+import sys
+
+import httpx
+import pytest
+
+# Add backend to path and import the backend graph once per session (per xdist worker)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from app.models.schemas import BrandKit  # noqa: E402
+from app.services.brand_service import BrandService  # noqa: E402
+
+try:
+    from app.core.critique_engine import CritiqueEngine  # noqa: E402
+except ImportError as e:  # Gemini / Vertex SDKs not installed
+    CritiqueEngine = None
+    _critique_import_error = str(e)
+
+# test_api_quick.py is a chained demo script (each step feeds the next); run it directly
+collect_ignore = ["test_api_quick.py"]
+
+SERVER = os.getenv("BRANDAI_SERVER", "http://127.0.0.1:8000")
+
+# Client socket options: no Nagle delay on small request bodies, reusable local addresses
+SOCKET_OPTIONS = [
+    (socket.SOL_SOCKET, socket.SO_REUSEADDR, 1),
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+]
+
+
+@pytest.fixture(scope="session")
+def brand_service():
+    """One BrandService per test worker"""
+    return BrandService()
+
+
+@pytest.fixture(scope="session")
+def critique_engine():
+    """One CritiqueEngine per test worker (skips when its SDKs are missing)"""
+    if CritiqueEngine is None:
+        pytest.skip(f"CritiqueEngine unavailable: {_critique_import_error}")
+    return CritiqueEngine()
+
+
+@pytest.fixture
+def sample_brand():
+    return BrandKit(
+        brand_id="nike-demo",
+        brand_name="Nike Demo",
+        primary_colors=["#FF0000", "#000000", "#FFFFFF"],
+        secondary_colors=["#808080"],
+        tone_of_voice=["energetic", "inspiring", "bold"],
+        brand_values=["innovation", "performance", "authenticity"],
+        guidelines="Always show movement and energy. Use bold typography."
+    )
+
+
+@pytest.fixture(scope="session")
+def server():
+    """Base URL of a running backend; skips the API tests when none is up"""
+    try:
+        httpx.get(f"{SERVER}/health", timeout=3).raise_for_status()
+    except httpx.HTTPError as e:
+        pytest.skip(f"BrandAI server not reachable at {SERVER}: {e}")
+    return SERVER
+
+
+@pytest.fixture
+async def api_client(server):
+    """Pooled HTTP/2-capable client against the running backend"""
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=2, socket_options=SOCKET_OPTIONS)
+    async with httpx.AsyncClient(
+        base_url=server,
+        timeout=httpx.Timeout(30.0, connect=3.0),  # fail fast when the server is down
+        transport=transport
+    ) as client:
+        yield client
@@ -87,7 +87,7 @@ Write-Host "3. Open the web interface:" -ForegroundColor White
 Write-Host "   start ..\frontend\index.html" -ForegroundColor Gray
 Write-Host ""
 Write-Host "4. Or run the demo:" -ForegroundColor White
-Write-Host "   python test_critique.py" -ForegroundColor Gray
+Write-Host "   pytest test_critique.py" -ForegroundColor Gray
 Write-Host ""
 Write-Host "📚 Documentation:" -ForegroundColor Yellow
 Write-Host "   - README.md - Project overview" -ForegroundColor Gray
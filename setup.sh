@@ -90,7 +90,7 @@ echo "   open frontend/index.html  # Mac"
 echo "   xdg-open frontend/index.html  # Linux"
 echo ""
 echo "5. Or run the demo:"
-echo "   python test_critique.py"
+echo "   pytest test_critique.py"
 echo ""
 echo "📚 Documentation:"
 echo "   - README.md - Project overview"
@@ -6,9 +6,19 @@ Run this to quickly test all endpoints before your presentation
 import requests
 import json
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://localhost:8000"
 
+# One pooled keep-alive connection for every call (retries only apply to idempotent GETs)
+session = requests.Session()
+session.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
 def print_section(title):
     print("\n" + "="*60)
     print(f"  {title}")
@@ -18,7 +28,7 @@ def test_health():
     """Test if server is running"""
     print_section("1. Health Check")
     try:
-        response = requests.get(f"{BASE_URL}/")
+        response = session.get(f"{BASE_URL}/")
         print(f"✅ Server Status: {response.status_code}")
         print(f"Response: {response.json()}")
         return True
@@ -38,7 +48,7 @@ def test_create_brand_kit():
     }
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/brand-kit",
             json=brand_kit
         )
@@ -77,7 +87,7 @@ def test_multi_agent_workflow(brand_id):
         print("🚀 Starting workflow (this may take 30-60 seconds)...")
         print(f"Request: {json.dumps(workflow_request, indent=2)}")
         
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}/api/multi-agent/generate-and-critique",
             json=workflow_request
         )
@@ -131,7 +141,7 @@ def test_workflow_status(workflow_id):
         return
     
     try:
-        response = requests.get(f"{BASE_URL}/api/multi-agent/workflow-status")
+        response = session.get(f"{BASE_URL}/api/multi-agent/workflow-status")
         
         if response.status_code == 200:
             workflows = response.json()
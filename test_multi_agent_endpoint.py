@@ -1,46 +1,54 @@
 """
-Quick test script for the multi-agent endpoint
+Smoke tests for the multi-agent endpoint (need a running server)
+
+For the Gemini Batch Mode check run batch_smoke.py manually (it does not use the server).
+GEMINI_TIER picks the Gemini service tier of the refinement calls (default: flex).
 """
-import requests
 import json
+import os
+
+import httpx
 
-# Test 1: Workflow status
-print("Testing /api/multi-agent/workflow-status...")
-try:
-    response = requests.get("http://localhost:8000/api/multi-agent/workflow-status")
-    print(f"Status Code: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print("✅ Workflow status endpoint works!\n")
-except Exception as e:
-    print(f"❌ Error: {e}\n")
-
-# Test 2: Generate and refine (minimal test)
-print("Testing /api/multi-agent/generate-and-refine...")
-payload = {
+PAYLOAD = {
     "prompt": "Create a simple ad for running shoes",
     "max_iterations": 1,
     "score_threshold": 0.5,
     "aspect_ratio": "1:1",
-    "include_logo": False
+    "include_logo": False,
+    "service_tier": os.getenv("GEMINI_TIER", "flex")  # CI probe: discounted refinement capacity
 }
 
-try:
-    response = requests.post(
-        "http://localhost:8000/api/multi-agent/generate-and-refine",
-        json=payload,
-        timeout=60
-    )
-    print(f"Status Code: {response.status_code}")
-    if response.status_code == 200:
-        result = response.json()
-        print(f"Success: {result.get('success')}")
-        print(f"Message: {result.get('message')}")
-        print(f"Iterations: {result.get('iterations_count')}")
-        print("✅ Multi-agent endpoint works!")
-    else:
-        print(f"Response: {response.text}")
-        print("⚠️ Non-200 status code")
-except requests.exceptions.ConnectionError:
-    print("❌ Server not running or not accessible at localhost:8000")
-except Exception as e:
-    print(f"❌ Error: {e}")
+
+async def test_workflow_status(api_client):
+    response = await api_client.get("/api/multi-agent/workflow-status")
+
+    assert response.status_code == 200
+    assert response.json()
+
+
+async def test_generate_and_refine(api_client):
+    # Start the workflow as a background job, then follow its progress events
+    response = await api_client.post("/api/multi-agent/jobs", json=PAYLOAD)
+    assert response.status_code == 200, response.text
+    stream_url = response.json()["stream_url"]
+
+    event = None
+    async with api_client.stream(
+        "GET",
+        stream_url,
+        headers={"Accept-Encoding": "identity"},  # keep events unbuffered
+        timeout=httpx.Timeout(30.0, connect=3.0, read=120.0)  # max gap between events
+    ) as stream:
+        assert stream.status_code == 200
+        async for line in stream.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            print(f"   {event['status']}: {event.get('stage', '')}")
+            if event["status"] in ("done", "error"):
+                break
+
+    assert event is not None and event["status"] == "done", event
+    result = event["result"]
+    assert result["iterations_count"] >= 1
+    assert "success" in result and result["message"]
@@ -0,0 +1,46 @@
+"""
+Test that the refinement agent sends the requested Gemini service tier
+(no network: the client's generate_content is replaced by a recorder)
+"""
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+from app.core.refinement_agent import RefinementAgent
+
+CRITIQUE = {"overall_score": 0.5, "brand_alignment": {"score": 0.4, "feedback": "Off-brand colors"}}
+DESCRIPTION = {"visual_elements": {"colors": ["#00FF00"], "style": "flat", "quality": "good"}}
+
+
+@pytest.fixture
+def recorded_calls(monkeypatch):
+    """RefinementAgent whose Gemini calls are recorded instead of sent"""
+    agent = RefinementAgent(api_key="test-key")
+    calls = []
+
+    async def generate_content(*, model, contents, config=None):
+        calls.append({"model": model, "config": config})
+        return SimpleNamespace(text='{"improved_prompt": "Bold red running shoes ad", "changes_made": []}')
+
+    monkeypatch.setattr(agent.client.aio.models, "generate_content", generate_content)
+    return agent, calls
+
+
+@pytest.mark.parametrize("tier", ["flex", "priority"])
+async def test_service_tier_is_forwarded(recorded_calls, tier):
+    agent, calls = recorded_calls
+    result = await agent.generate_improved_prompt(
+        "Running shoes ad", CRITIQUE, DESCRIPTION, service_tier=tier
+    )
+
+    assert result["improved_prompt"] == "Bold red running shoes ad"
+    assert len(calls) == 1
+    assert calls[0]["config"].service_tier == types.ServiceTier(tier)
+
+
+async def test_service_tier_defaults_to_standard(recorded_calls):
+    agent, calls = recorded_calls
+    await agent.generate_improved_prompt("Running shoes ad", CRITIQUE, DESCRIPTION)
+
+    assert calls[0]["config"].service_tier == types.ServiceTier.STANDARD
@@ -1,76 +1,17 @@
 """
-Quick Test: Video Generator with Uploads
-"""
-import requests
-import json
-from pathlib import Path
-
-API_BASE = "http://127.0.0.1:8000/api"
-
-print("🎬 Testing AI Video Ad Generator with File Uploads\n")
-print("=" * 60)
-
-# Test 1: Check server health
-print("\n1️⃣ Checking server health...")
-try:
-    response = requests.get(f"{API_BASE.replace('/api', '')}/health")
-    if response.ok:
-        print("✅ Server is healthy!")
-        print(f"   Response: {response.json()}")
-    else:
-        print("❌ Server health check failed")
-        exit(1)
-except Exception as e:
-    print(f"❌ Error connecting to server: {e}")
-    exit(1)
+Quick Test: Video Generator with Uploads (needs a running server)
 
-# Test 2: List available brand kits
-print("\n2️⃣ Loading brand kits...")
-try:
-    response = requests.get(f"{API_BASE}/brand-kits")
-    if response.ok:
-        brands = response.json()
-        print(f"✅ Found {len(brands)} brand kit(s)")
-        for brand in brands[:3]:  # Show first 3
-            print(f"   - {brand['brand_name']} (ID: {brand['brand_id']})")
-            print(f"     Colors: {', '.join(brand['primary_colors'][:3])}")
-    else:
-        print("❌ Failed to load brand kits")
-except Exception as e:
-    print(f"❌ Error: {e}")
-
-# Test 3: Upload sample files (if you have them)
-print("\n3️⃣ Testing file upload endpoints...")
-print("   ℹ️  Upload API available at:")
-print(f"      POST {API_BASE}/upload/brand-logo")
-print(f"      POST {API_BASE}/upload/product-image")
-print("   📝 To test manually:")
-print('      curl -X POST http://127.0.0.1:8000/api/upload/brand-logo -F "file=@logo.png"')
-
-# Test 4: Check static file serving
-print("\n4️⃣ Static file serving...")
-print("   ✅ Generated ads accessible at: http://127.0.0.1:8000/generated_ads/[filename]")
-print("   ✅ Uploads accessible at: http://127.0.0.1:8000/uploads/[type]/[filename]")
+RUN_SAMPLE_GENERATION=1 also submits the sample video generation request.
+Manual checks: open http://127.0.0.1:8000/video_generator.html, upload a logo /
+product image via POST /api/upload/brand-logo and /api/upload/product-image,
+and see VIDEO_GENERATOR_GUIDE.md.
+"""
+import os
 
-# Test 5: List generated ads
-print("\n5️⃣ Checking generated ads folder...")
-try:
-    ads_dir = Path("backend/generated_ads")
-    if ads_dir.exists():
-        files = list(ads_dir.glob("*.*"))
-        print(f"   Found {len(files)} generated file(s)")
-        for f in files[:3]:  # Show first 3
-            size_kb = f.stat().st_size / 1024
-            print(f"   - {f.name} ({size_kb:.1f} KB)")
-            print(f"     URL: http://127.0.0.1:8000/generated_ads/{f.name}")
-    else:
-        print("   ℹ️  No generated ads yet")
-except Exception as e:
-    print(f"   ℹ️  {e}")
+import ijson
+import pytest
 
-# Test 6: Sample video generation request
-print("\n6️⃣ Sample Video Generation Request:")
-sample_request = {
+SAMPLE_REQUEST = {
     "prompt": "Create a vibrant video ad for organic juice with fresh fruits",
     "brand_kit_id": "purevita_food",
     "media_type": "video",
@@ -82,16 +23,48 @@ sample_request = {
     "product_image_path": None  # Optional: path to uploaded product
 }
 
-print(f"   POST {API_BASE}/multi-agent/generate-and-refine")
-print(f"   Body: {json.dumps(sample_request, indent=4)}")
 
-print("\n" + "=" * 60)
-print("🎯 Next Steps:")
-print("1. Open http://127.0.0.1:8000/video_generator.html in browser")
-print("2. Select brand kit and write prompt")
-print("3. Upload brand logo and product image (optional)")
-print("4. Click 'Generate AI Video Ad'")
-print("5. View generated video with quality scores")
-print("6. Download final video ad")
-print("\n📚 Documentation: VIDEO_GENERATOR_GUIDE.md")
-print("=" * 60)
+class _AsyncChunkReader:
+    """Minimal async file-like view over a byte-chunk iterator (what ijson reads from)"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+
+    async def read(self, size=-1):
+        if size == 0:  # ijson probes the stream type with read(0)
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+async def test_debug_status(api_client):
+    # Health, brand kits and generated ads share one round trip
+    response = await api_client.get("/api/_debug/status")
+
+    assert response.status_code == 200
+    status = response.json()
+    assert status["health"]["status"] == "healthy"
+    for brand in status["brand_kits"]:
+        assert brand["brand_id"] and brand["primary_colors"]
+    for ad in status["generated_ads"]:
+        assert ad["name"] and ad["size"] >= 0
+
+
+@pytest.mark.skipif(not os.getenv("RUN_SAMPLE_GENERATION"), reason="set RUN_SAMPLE_GENERATION=1 to run")
+async def test_sample_video_generation(api_client):
+    # Stream the (potentially large) workflow response and stop once the summary keys arrive
+    wanted = {"success", "iterations_count", "message"}
+    seen = {}
+    async with api_client.stream(
+        "POST", "/api/multi-agent/generate-and-refine", json=SAMPLE_REQUEST, timeout=60
+    ) as response:
+        assert response.status_code == 200
+        async for prefix, event, value in ijson.parse_async(_AsyncChunkReader(response.aiter_bytes())):
+            if prefix in wanted and event in ("boolean", "number", "string"):
+                seen[prefix] = value
+                if len(seen) == len(wanted):
+                    break
+
+    assert set(seen) == wanted